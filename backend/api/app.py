@@ -10,15 +10,9 @@ from flask_cors import CORS
 from flask_socketio import SocketIO
 
 from api.utils.config import Config
-from api.utils.logging import LoggerManager
+from api.utils.logging import logger_manager
 from api.utils.query_manager import QueryManager
-# Archived: spam detector temporarily disabled (Oct 2025)
-try:
-    from api.models.spam_detector import AdvancedSpamDetector as SpamDetector
-except Exception:  # Module archived or unavailable
-    SpamDetector = None  # type: ignore
-from api.models.rag_system import RAGSystem
-from api.models.voice_model import VoiceModel
+from api.services.ai_services import get_service
 from app.asset_loader import asset_url, asset_css, reset_manifest_cache
 from .controllers import (
     feed_controller,
@@ -116,8 +110,9 @@ def create_app(config_override=None):
 
     # Logging
     try:
-        logger_manager = LoggerManager()
         logger_manager.configure(cfg.logging)
+        # Kept so shutdown can drain queued records (see api/run.py)
+        app.config["LOGGER_MANAGER"] = logger_manager
     except Exception as exc:  # noqa: BLE001
         logging.basicConfig(level=logging.INFO)
         logging.getLogger(__name__).warning("Logging configuration failed: %s", exc)
@@ -137,41 +132,48 @@ def create_app(config_override=None):
     # Database (SQLAlchemy used elsewhere; psycopg pool archived)
     app.config["DB_MANAGER"] = None
 
-    # AI Models
-    try:
-        # Import here after environment flags are set
-        from api.models.ollama_service import OllamaService
+    # AI Models: register factories only; each subsystem is built on first
+    # use through api.services.ai_services.get_service so startup does not
+    # pay for model/library loading
+    def build_spam_detector():
         # Archived feature: Spam detector (Oct 2025)
-        if app.config["SPAM_DETECTION_ENABLED"] and SpamDetector is not None:
-            app.config["SPAM_DETECTOR"] = SpamDetector(cfg)
-        else:
-            app.config["SPAM_DETECTOR"] = None
-
-        app.config["RAG_SYSTEM"] = RAGSystem(cfg, app.config.get("OLLAMA_SERVICE"))
-
-        if app.config["VOICE_CLONING_ENABLED"]:
-            app.config["VOICE_MODEL"] = VoiceModel()
-        else:
-            app.config["VOICE_MODEL"] = None
-
+        if not app.config["SPAM_DETECTION_ENABLED"]:
+            return None
+        try:
+            from api.models.spam_detector import AdvancedSpamDetector as SpamDetector
+        except Exception:  # Module archived or unavailable
+            return None
+        return SpamDetector(cfg)
+
+    def build_rag_system():
+        from api.models.rag_system import RAGSystem
+        return RAGSystem(cfg, get_service(app, "OLLAMA_SERVICE"))
+
+    def build_voice_model():
+        if not app.config["VOICE_CLONING_ENABLED"]:
+            return None
+        from api.models.voice_model import VoiceModel
+        return VoiceModel()
+
+    def build_ollama_service():
         # Initialize OLLama service for data feeds
+        from api.models.ollama_service import OllamaService
         ollama_model_path = os.getenv(
             "OLLAMA_MODEL_PATH",
             "C:/Users/033690343/OneDrive - csulb/Models-LLM/Llama-3.2-1B-Instruct"
         )
         ollama_embedding_dim = int(os.getenv("OLLAMA_EMBEDDING_DIM", "384"))
-        app.config["OLLAMA_SERVICE"] = OllamaService(
+        return OllamaService(
             model_path=ollama_model_path,
             embedding_dim=ollama_embedding_dim
         )
-    except Exception as exc:  # noqa: BLE001
-        logging.getLogger(__name__).exception("AI model initialization failed")
-        app.config.update(
-            SPAM_DETECTOR=None,
-            RAG_SYSTEM=None,
-            VOICE_MODEL=None,
-            OLLAMA_SERVICE=None,
-        )
+
+    app.config.update(
+        SPAM_DETECTOR_FACTORY=build_spam_detector,
+        RAG_SYSTEM_FACTORY=build_rag_system,
+        VOICE_MODEL_FACTORY=build_voice_model,
+        OLLAMA_SERVICE_FACTORY=build_ollama_service,
+    )
 
     os.makedirs(app.config["AI_MODEL_PATH"], exist_ok=True)
     os.makedirs(app.config["VOICE_SAMPLES_PATH"], exist_ok=True)
@@ -182,10 +184,7 @@ def create_app(config_override=None):
         print('before request')
         g.config = app.config.get("APP_CONFIG")
         g.db_manager = app.config.get("DB_MANAGER")
-        g.spam_detector = app.config.get("SPAM_DETECTOR")
-        g.rag_system = app.config.get("RAG_SYSTEM")
-        g.voice_model = app.config.get("VOICE_MODEL")
-        g.ollama_service = app.config.get("OLLAMA_SERVICE")
+        # AI subsystems are resolved lazily via get_service(), not per request
         g.query_manager = app.config.get("QUERY_MANAGER")
         session.permanent = True
 
@@ -2,6 +2,7 @@
 from flask import Blueprint, jsonify, request, current_app, session
 from api.repositories.calls_repo import CallsRepository
 from api.repositories.contacts_repo import ContactsRepository
+from api.repositories._clock import window
 # Archived: spam detector temporarily disabled (Oct 2025)
 try:
     from api.models.spam_detector import AdvancedSpamDetector as SpamDetector
@@ -10,7 +11,7 @@ except Exception:
 from api.utils.validation import contains_sensitive
 import logging
 # import json
-from datetime import datetime, timedelta
+from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
@@ -314,8 +315,7 @@ def get_insights():
         
         # Get date range for analysis
         days = int(request.args.get('days', 30))
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
+        start_date, end_date = window(days)
         
         # Get call statistics
         stats = calls_repo.get_call_statistics(user_id, start_date.isoformat(), end_date.isoformat())
@@ -10,6 +10,7 @@ from flask import Blueprint, current_app, jsonify, request, session
 from werkzeug.utils import secure_filename
 
 from api.repositories.documents_repo import DocumentsRepository
+from api.services.ai_services import get_service
 from api.utils.file_processors import (
     process_file,
     process_text_input,
@@ -71,8 +72,8 @@ def upload_file():
 
     cfg = current_app.config["APP_CONFIG"]
     repo = DocumentsRepository(cfg.database_url, cfg.queries)
-    ollama_service = current_app.config.get("OLLAMA_SERVICE")
-    rag_system = current_app.config.get("RAG_SYSTEM")
+    ollama_service = get_service(current_app, "OLLAMA_SERVICE")
+    rag_system = get_service(current_app, "RAG_SYSTEM")
 
     description = request.form.get("description", "")
     classification = request.form.get("classification", "internal")
@@ -297,7 +298,7 @@ def submit_text():
             error = result.get("metadata", {}).get("error", "Failed to process text")
             return jsonify({"error": error}), 400
 
-        ollama_service = current_app.config.get("OLLAMA_SERVICE")
+        ollama_service = get_service(current_app, "OLLAMA_SERVICE")
         concepts = extract_key_concepts(result["processed_content"], ollama_service)
         embedding = None
         ollama_model = None
@@ -334,7 +335,7 @@ def submit_text():
 
         # RAG embedding
         try:
-            rag_system = current_app.config.get("RAG_SYSTEM")
+            rag_system = get_service(current_app, "RAG_SYSTEM")
             if rag_system:
                 rag_system.store_document_embedding(user_id, result["processed_content"], "document", document_id, {"name": name})
         except Exception:
@@ -0,0 +1,38 @@
+-- =============================================
+-- COMPOSITE INDEXES FOR CALL AND INSTRUCTION LISTS
+-- =============================================
+-- communication.calls: per-user status filters
+--   WHERE user_id = $1 AND status = $2
+-- (user_id, started_at) is already covered by idx_calls_user_date.
+--
+-- ai_intelligence.ai_instructions: active-instruction lookups
+--   WHERE user_id = $1 AND status = 'active'
+--     AND (expires_at IS NULL OR expires_at >= now())
+-- The existing single-column idx_ai_instructions_user and
+-- idx_ai_instructions_status cannot serve the expiry range together
+-- with the equality filters.
+--
+-- communication_sessions (the ORM table CommunicationSession and Call map
+-- onto): per-user history ordered by start and per-user status filters.
+-- These use the names declared in CommunicationSession.__table_args__, as
+-- does the ai_instructions index in AIInstruction.__table_args__; the
+-- communication.calls index exists only here, for the raw-SQL queries.
+--
+-- CONCURRENTLY cannot run inside a transaction block.
+-- Usage: psql "your_database_url" -f backend/api/db/migrations/calls_ai_instructions_composite_indexes.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_calls_user_status
+    ON communication.calls USING btree (user_id, status);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_sessions_user_started
+    ON communication_sessions USING btree (user_id, started_at);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_sessions_user_status
+    ON communication_sessions USING btree (user_id, status);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_ai_instructions_user_status_expires
+    ON ai_intelligence.ai_instructions USING btree (user_id, status, expires_at);
+
+ANALYZE communication.calls;
+ANALYZE communication_sessions;
+ANALYZE ai_intelligence.ai_instructions;
@@ -0,0 +1,24 @@
+-- =============================================
+-- COVERING INDEX FOR FREQUENT-CONTACT AGGREGATES
+-- =============================================
+-- Serves the frequent-contacts rollup over communication.calls:
+--   SELECT from_number, contact_id, COUNT(id), SUM(duration_seconds)
+--   FROM communication.calls
+--   WHERE user_id = $1 AND started_at >= $2 AND is_spam = false
+--   GROUP BY from_number, contact_id
+--
+-- The key matches the filter columns and INCLUDE carries the grouped and
+-- summed columns. That lets Postgres answer the aggregate with an
+-- index-only scan instead of visiting the heap. The table has no
+-- phone_number/caller_name columns; from_number and contact_id are what
+-- identify the counterpart here.
+--
+-- CONCURRENTLY cannot run inside a transaction block.
+-- Usage: psql "your_database_url" -f backend/api/db/migrations/calls_frequent_contacts_index.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_calls_freq_contacts
+    ON communication.calls USING btree (user_id, started_at, is_spam)
+    INCLUDE (from_number, contact_id, duration_seconds);
+
+-- Refresh the visibility map so index-only scans can skip heap checks
+VACUUM (ANALYZE) communication.calls;
@@ -0,0 +1,25 @@
+-- =============================================
+-- PARTIAL INDEX FOR ACTIVE FEED ITEMS
+-- =============================================
+-- Backs queries['feed']['list_active'] (FeedRepository.list_active):
+--   WHERE user_id = $1 AND status = 'active'
+--     AND (expires_at IS NULL OR expires_at > now())
+--   ORDER BY created_at DESC
+--
+-- Only active rows are indexed, so the lookup cost tracks the number of
+-- active items per user rather than the total size of feed_items. The
+-- status column is dropped from the key because the predicate already
+-- pins it; expires_at stays in the key so expired rows are skipped in
+-- the index instead of being fetched from the heap.
+--
+-- CONCURRENTLY cannot run inside a transaction block.
+-- Usage: psql "your_database_url" -f backend/api/db/migrations/feed_items_active_index.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_feed_items_active_user_expires
+    ON ai_intelligence.feed_items USING btree (user_id, expires_at)
+    WHERE (status = 'active'::text);
+
+-- Superseded by idx_feed_items_active_user_expires
+DROP INDEX CONCURRENTLY IF EXISTS ai_intelligence.idx_feed_items_active;
+
+ANALYZE ai_intelligence.feed_items;
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+
+def utcnow() -> datetime:
+    """Current UTC time.
+
+    Returned naive to match the ``DateTime`` columns, which store UTC without
+    tzinfo.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def window(days: int) -> tuple[datetime, datetime]:
+    """Return the ``(start, end)`` pair covering the last ``days`` days.
+
+    Only the start is truncated to the minute, which keeps it (and any cache
+    key built from it) stable for a full minute; the end is the current time,
+    so the newest records are always inside the window.
+    """
+    end = utcnow()
+    start = (end - timedelta(days=days)).replace(second=0, microsecond=0)
+    return start, end
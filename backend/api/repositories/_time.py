@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Optional
+
+# Optional C-accelerated ISO-8601 parser with graceful fallback
+try:
+    import ciso8601
+    CISO8601_AVAILABLE = True
+except ImportError:
+    ciso8601 = None
+    CISO8601_AVAILABLE = False
+
+_parse_iso = ciso8601.parse_datetime if CISO8601_AVAILABLE else datetime.fromisoformat
+
+
+def parse_dt(value: Any) -> Any:
+    """Parse ISO-8601 strings into datetimes; any other value is returned untouched."""
+    if not isinstance(value, str):
+        return value
+    return _parse_iso(value)
+
+
+def coerce_dt(value: Any) -> Optional[datetime]:
+    """Lenient variant of parse_dt returning None for empty or malformed input."""
+    if not value:
+        return None
+    try:
+        return parse_dt(value)
+    except (ValueError, TypeError):
+        return None
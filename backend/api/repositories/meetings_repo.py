@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, List, Optional
 
+from api.repositories._clock import window
 from api.repositories.communication_repo import CommunicationRepository
 
 logger = logging.getLogger(__name__)
@@ -64,8 +65,7 @@ class MeetingsRepository:
         return self.repo.get_recent_sessions(user_id, "meeting", limit)
 
     def get_weekly_summary(self, user_id: int) -> Dict:
-        end = datetime.utcnow()
-        start = end - timedelta(days=7)
+        start, end = window(7)
         filters = {
             "user_id": user_id,
             "session_type": "meeting",
@@ -8,6 +8,7 @@ from typing import Dict, List, Optional
 from sqlalchemy import create_engine, func
 from sqlalchemy.orm import Session, sessionmaker
 
+from api.repositories._time import coerce_dt
 from api.repositories.communication_repo import CommunicationRepository
 from functionalities.communication_session import (
     CommunicationSession,
@@ -173,7 +174,7 @@ class TextsRepository:
             )
 
             last_sent_at = message_data.get("sent_at")
-            dt_sent_at = _coerce_datetime(last_sent_at) or datetime.utcnow()
+            dt_sent_at = coerce_dt(last_sent_at) or datetime.utcnow()
             metadata = chat_session.session_metadata or {}
             metadata["last_message_at"] = last_sent_at or dt_sent_at.isoformat()
             metadata["contact_id"] = contact_id
@@ -348,14 +349,3 @@ def _contact_id_from_identifier(identifier: Optional[str]) -> Optional[int]:
         return int(value) if value != "unknown" else None
     except ValueError:
         return None
-
-
-def _coerce_datetime(value: Optional[str]) -> Optional[datetime]:
-    if not value:
-        return None
-    if isinstance(value, datetime):
-        return value
-    try:
-        return datetime.fromisoformat(value)
-    except (ValueError, TypeError):
-        return None
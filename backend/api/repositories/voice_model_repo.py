@@ -1,13 +1,41 @@
 
 from typing import List, Dict, Optional
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine, and_, or_, desc
+from sqlalchemy.orm import sessionmaker, load_only
+from sqlalchemy import create_engine, and_, or_, desc, insert, select, bindparam
 from api.repositories.base import BaseRepository
 from functionalities.voice_model import VoiceModel, VoiceSample, VoiceGeneration
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Columns serialized by VoiceModel.to_dict(); listings skip paths and error blobs
+_LIST_COLUMNS = (
+    VoiceModel.id,
+    VoiceModel.model_name,
+    VoiceModel.model_version,
+    VoiceModel.provider,
+    VoiceModel.training_status,
+    VoiceModel.training_progress,
+    VoiceModel.quality_score,
+    VoiceModel.sample_count,
+    VoiceModel.training_duration_minutes,
+    VoiceModel.is_active,
+    VoiceModel.created_at,
+    VoiceModel.completed_at,
+    VoiceModel.disclosure_message,
+)
+
+# Statements are built once so SQLAlchemy's compiled cache is hit on every call
+_Q_USER_MODELS = (
+    select(VoiceModel)
+    .options(load_only(*_LIST_COLUMNS))
+    .where(VoiceModel.user_id == bindparam("uid"))
+    .order_by(desc(VoiceModel.created_at))
+)
+_Q_USER_ACTIVE_MODELS = _Q_USER_MODELS.where(VoiceModel.is_active == True)  # noqa: E712
+_Q_MODEL = select(VoiceModel).where(VoiceModel.id == bindparam("mid"))
+_Q_USER_MODEL = _Q_MODEL.where(VoiceModel.user_id == bindparam("uid"))
+
 class VoiceModelRepository(BaseRepository):
     """Repository for voice model operations"""
     
@@ -19,17 +47,18 @@ class VoiceModelRepository(BaseRepository):
         """Create a new voice model"""
         try:
             with self.get_session() as session:
-                voice_model = VoiceModel(
-                    user_id=user_id,
-                    model_name=model_data['model_name'],
-                    model_path=model_data['model_path'],
-                    training_config=model_data.get('training_config'),
-                    disclosure_text=model_data.get('disclosure_text')
+                # INSERT ... RETURNING hydrates server defaults without a follow-up SELECT
+                stmt = (
+                    insert(VoiceModel)
+                    .values(
+                        user_id=user_id,
+                        model_name=model_data['model_name'],
+                        model_path=model_data['model_path'],
+                        disclosure_message=model_data.get('disclosure_text')
+                    )
+                    .returning(VoiceModel)
                 )
-                
-                session.add(voice_model)
-                session.commit()
-                session.refresh(voice_model)
+                voice_model = session.execute(stmt).scalar_one()
                 
                 logger.info(f"Created voice model {voice_model.id} for user {user_id}")
                 return voice_model.to_dict()
@@ -42,12 +71,8 @@ class VoiceModelRepository(BaseRepository):
         """Get all voice models for a user"""
         try:
             with self.get_session() as session:
-                query = session.query(VoiceModel).filter(VoiceModel.user_id == user_id)
-                
-                if not include_inactive:
-                    query = query.filter(VoiceModel.is_active == True)
-                
-                models = query.order_by(desc(VoiceModel.created_at)).all()
+                stmt = _Q_USER_MODELS if include_inactive else _Q_USER_ACTIVE_MODELS
+                models = session.execute(stmt, {"uid": user_id}).scalars().all()
                 return [model.to_dict() for model in models]
                 
         except Exception as e:
@@ -58,12 +83,12 @@ class VoiceModelRepository(BaseRepository):
         """Get a specific voice model by ID"""
         try:
             with self.get_session() as session:
-                query = session.query(VoiceModel).filter(VoiceModel.id == model_id)
-                
                 if user_id:
-                    query = query.filter(VoiceModel.user_id == user_id)
+                    result = session.execute(_Q_USER_MODEL, {"mid": model_id, "uid": user_id})
+                else:
+                    result = session.execute(_Q_MODEL, {"mid": model_id})
                 
-                model = query.first()
+                model = result.scalars().first()
                 return model.to_dict() if model else None
                 
         except Exception as e:
@@ -3,7 +3,7 @@ import os
 import sys
 import logging
 import signal
-import asyncio
+import threading
 from pathlib import Path
 
 # Add the project root to Python path
@@ -20,75 +20,87 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Hard deadline for graceful cleanup; stays under the 30s grace period
+# orchestrators such as Kubernetes allow before sending SIGKILL
+SHUTDOWN_TIMEOUT_SECONDS = 25
+
+# (app.config key, cleanup method) pairs run in order on shutdown
+SHUTDOWN_STEPS = (
+    ('DB_MANAGER', 'close_all_connections'),
+    ('SPAM_DETECTOR', 'cleanup'),
+    ('RAG_SYSTEM', 'cleanup'),
+)
+
+# Set by the first shutdown signal; a second signal forces an immediate exit
+_shutdown_started = False
+
 def setup_signal_handlers(app):
     """Setup graceful shutdown signal handlers"""
     def signal_handler(signum, frame):
+        global _shutdown_started
+        if _shutdown_started:
+            logger.warning(f"Received signal {signum} during shutdown, forcing exit")
+            os._exit(1)
+        _shutdown_started = True
         logger.info(f"Received signal {signum}, initiating graceful shutdown...")
         
+        # Backstop: the default SIGALRM action terminates the process if
+        # cleanup hangs (not available on Windows)
+        if hasattr(signal, "alarm"):
+            signal.alarm(SHUTDOWN_TIMEOUT_SECONDS)
+        
         # Cleanup tasks
-        try:
-            # Close database connections
-            if hasattr(app, 'config') and app.config.get('DB_MANAGER'):
-                app.config['DB_MANAGER'].close_all_connections()
-                logger.info("Database connections closed")
-            
-            # Cleanup AI models
-            if hasattr(app, 'config'):
-                spam_detector = app.config.get('SPAM_DETECTOR')
-                rag_system = app.config.get('RAG_SYSTEM')
-                
-                if spam_detector:
-                    spam_detector.cleanup()
-                    logger.info("Spam detector cleaned up")
-                
-                if rag_system:
-                    rag_system.cleanup()
-                    logger.info("RAG system cleaned up")
-            
-            logger.info("Graceful shutdown completed")
-            
-        except Exception as e:
-            logger.error(f"Error during shutdown: {e}")
+        config = getattr(app, 'config', {})
+        for key, method in SHUTDOWN_STEPS:
+            try:
+                obj = config.get(key)
+                if obj is not None:
+                    getattr(obj, method)()
+                    logger.info(f"{key} cleaned up")
+            except Exception as e:
+                logger.error(f"Error during shutdown of {key}: {e}")
+        
+        logger.info("Graceful shutdown completed")
+        
+        # Flush queued log records last so the messages above are delivered
+        logger_manager = config.get('LOGGER_MANAGER')
+        if logger_manager is not None:
+            logger_manager.shutdown()
         
         sys.exit(0)
     
-    # Register signal handlers
+    # Register signal handlers. The server runs a blocking WSGI loop rather
+    # than an asyncio event loop, so loop.add_signal_handler() callbacks would
+    # never be dispatched; plain handlers are only installable from the main
+    # thread, so skip registration when embedded elsewhere (e.g. test runners).
+    if threading.current_thread() is not threading.main_thread():
+        logger.warning("Not in main thread; skipping shutdown signal handlers")
+        return
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
+# DATABASE_URL is enforced via code/api/.env (loaded by Config), not from process env
+REQUIRED_ENV_VARS = ('SECRET_KEY',)
+
+# Optional but recommended variables
+OPTIONAL_ENV_VARS = (
+    'TWILIO_ACCOUNT_SID',
+    'TWILIO_AUTH_TOKEN',
+    'DEEPGRAM_API_KEY',
+    'ELEVENLABS_API_KEY',
+    'OPENAI_API_KEY'
+)
+
 def validate_environment():
     """Validate required environment variables and configuration"""
-    required_vars = [
-        # DATABASE_URL is enforced via code/api/.env (loaded by Config), not from process env
-        'SECRET_KEY'
-    ]
-    
-    missing_vars = []
-    for var in required_vars:
-        if not os.getenv(var):
-            missing_vars.append(var)
-    
-    if missing_vars:
-        logger.error(f"Missing required environment variables: {', '.join(missing_vars)}")
+    env = os.environ
+    if missing := ', '.join(var for var in REQUIRED_ENV_VARS if not env.get(var)):
+        logger.error(f"Missing required environment variables: {missing}")
         logger.error("Please check your .env file or environment configuration")
         return False
     
-    # Validate optional but recommended variables
-    optional_vars = [
-        'TWILIO_ACCOUNT_SID',
-        'TWILIO_AUTH_TOKEN',
-        'DEEPGRAM_API_KEY',
-        'ELEVENLABS_API_KEY',
-        'OPENAI_API_KEY'
-    ]
-    
-    missing_optional = []
-    for var in optional_vars:
-        if not os.getenv(var):
-            missing_optional.append(var)
-    
-    if missing_optional:
-        logger.warning(f"Optional environment variables not set: {', '.join(missing_optional)}")
+    if missing_optional := ', '.join(var for var in OPTIONAL_ENV_VARS if not env.get(var)):
+        logger.warning(f"Optional environment variables not set: {missing_optional}")
         logger.warning("Some features may not be available")
     
     return True
@@ -104,10 +116,11 @@ def create_directories():
         'temp'
     ]
     
-    for directory in directories:
-        dir_path = project_root / directory
-        dir_path.mkdir(exist_ok=True)
-        logger.info(f"Ensured directory exists: {dir_path}")
+    missing = [project_root / d for d in directories if not (project_root / d).is_dir()]
+    for dir_path in missing:
+        os.makedirs(dir_path, exist_ok=True)
+    if missing:
+        logger.info(f"Created directories: {', '.join(str(p) for p in missing)}")
 
 def main():
     """Main application entry point"""
@@ -0,0 +1,34 @@
+"""
+Lazy construction of the heavyweight AI subsystems held in ``app.config``.
+
+``create_app`` registers a zero-argument factory under ``<KEY>_FACTORY`` for
+each subsystem; the instance itself is only built (and cached under ``<KEY>``)
+the first time something asks for it via :func:`get_service`. Shutdown code should
+read ``app.config.get(KEY)`` directly so it never builds a subsystem just to
+clean it up.
+"""
+import logging
+import threading
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Re-entrant: one factory may resolve another (RAG_SYSTEM needs OLLAMA_SERVICE)
+_build_lock = threading.RLock()
+
+
+def get_service(app: Any, key: str) -> Any:
+    """Return the subsystem stored under ``key``, building it on first use."""
+    config = app.config
+    if key in config:
+        return config[key]
+
+    with _build_lock:
+        if key not in config:
+            factory = config.get(f"{key}_FACTORY")
+            try:
+                config[key] = factory() if factory else None
+            except Exception:  # noqa: BLE001
+                logger.exception("%s initialization failed", key)
+                config[key] = None
+        return config[key]
@@ -1,27 +1,164 @@
 
 import logging
 import logging.handlers
+import atexit
+import copy
 import json
 import time
-import socket
 import os
-import glob
-from typing import Any, Dict, Optional, Union
+import threading
+import queue
+from typing import Any, Dict, List, Optional, Union
 from datetime import datetime
 
-# Reserved logging fields
-RESERVED_FIELDS = {
+# Optional C-accelerated JSON encoder with graceful fallback
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+except ImportError:
+    orjson = None
+
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, default=str)
+
+# Optional Flask imports, resolved on first use so processes that never
+# serve requests (CLI tools, workers) do not pay for importing Flask
+FLASK_AVAILABLE: Optional[bool] = None
+has_request_context = lambda: False
+request = None
+g = object()
+
+
+def _load_flask() -> bool:
+    """Import Flask request globals once and record whether they are available."""
+    global FLASK_AVAILABLE, has_request_context, request, g
+    try:
+        from flask import has_request_context, request, g
+        FLASK_AVAILABLE = True
+    except ImportError:
+        # Graceful fallback when Flask is not available
+        FLASK_AVAILABLE = False
+    return FLASK_AVAILABLE
+
+
+# C-accelerated JSON string literal encoder (same escaping as ensure_ascii=False)
+_encode_str = json.encoder.encode_basestring
+
+# Reserved logging fields; "asctime" is added by text formatters on other
+# handlers and "taskName" by Python 3.12+
+RESERVED_FIELDS = frozenset({
     "name", "msg", "args", "levelname", "levelno", "pathname",
     "filename", "module", "exc_info", "exc_text", "stack_info",
     "lineno", "funcName", "created", "msecs", "relativeCreated",
-    "thread", "threadName", "processName", "process", "getMessage"
-}
+    "thread", "threadName", "processName", "process", "getMessage",
+    "asctime", "taskName"
+})
+
+# Keys always produced by JSONFormatter._build_base_entry
+BASE_ENTRY_FIELDS = frozenset({
+    "timestamp", "level", "logger", "message", "request_id",
+    "method", "path", "remote_addr", "user_agent"
+})
+
+# Keys JSONFormatter may write itself (a static field of the same name replaces them)
+_ENTRY_KEYS = BASE_ENTRY_FIELDS | {"exception"}
+
+# Extra record attributes of these types are emitted as-is by JSONFormatter
+_JSON_PASSTHROUGH_TYPES = (str, int, float, bool, type(None), list, dict, tuple)
+
+# Second-resolution cache for ISO-8601 timestamps: (epoch_second, "YYYY-MM-DDTHH:MM:SS")
+_ts_cache = (-1, "")
+
+
+def _format_timestamp(record: logging.LogRecord) -> str:
+    """Format record.created as UTC ISO-8601 with milliseconds, reusing the seconds part."""
+    global _ts_cache
+    sec = int(record.created)
+    cached_sec, prefix = _ts_cache
+    if sec != cached_sec:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
+        _ts_cache = (sec, prefix)
+    return f"{prefix}.{int(record.msecs):03d}Z"
+
+
+def _record_message(record: logging.LogRecord) -> str:
+    """
+    Interpolated message, computed once per record.
+    
+    Stored on record.message like logging.Formatter.format does, so every
+    handler formatting the same record shares one %-interpolation.
+    """
+    message = record.__dict__.get("message")
+    if message is None:
+        message = record.message = record.getMessage()
+    return message
+
+
+class CachedTimeFormatter(logging.Formatter):
+    """Plain-text formatter that renders the seconds part of asctime once per second."""
+
+    def __init__(self, fmt: Optional[str] = None, datefmt: Optional[str] = None):
+        super().__init__(fmt, datefmt)
+        # (epoch_second, rendered prefix), swapped as one tuple so threads
+        # sharing the formatter never pair a second with another's prefix
+        self._time_cache = (-1, "")
+
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        sec = int(record.created)
+        cached_sec, prefix = self._time_cache
+        if sec != cached_sec:
+            prefix = time.strftime(datefmt or self.default_time_format, self.converter(sec))
+            self._time_cache = (sec, prefix)
+        if datefmt:
+            return prefix
+        return self.default_msec_format % (prefix, record.msecs)
+
+
+CONSOLE_TEXT_FORMATTER = CachedTimeFormatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+FILE_TEXT_FORMATTER = CachedTimeFormatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+
+# Renders tracebacks for records handed to the background queue
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that keeps the exception separate from the message.
+    
+    The stock prepare() folds the traceback into msg and clears exc_info and
+    exc_text, so JSONFormatter behind the listener could no longer emit its
+    "exception" field. Here the message and traceback text are rendered on
+    the logging thread and stored in record.message / record.exc_text; only
+    exc_info (which pins traceback frames) is dropped.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        _record_message(record)
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _EXCEPTION_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
 
 class LoggingError(Exception):
     """Custom exception for logging-related errors."""
     pass
 
 
+# File log writes are batched in a buffer of this size and flushed on a
+# timer; ERROR and above are flushed immediately
+FILE_BUFFER_SIZE = 64 * 1024
+FILE_FLUSH_INTERVAL_SECONDS = 1.5
+
+
 class TimestampedRotatingFileHandler(logging.handlers.RotatingFileHandler):
     """
     A rotating file handler that creates timestamped log files.
@@ -31,6 +168,7 @@ class TimestampedRotatingFileHandler(logging.handlers.RotatingFileHandler):
     - Handles rollovers with iteration numbers
     - Format: service_name_YYYYMMDD_HHMMSS_N.log
     - Where N is the iteration number (0, 1, 2, etc.)
+    - Buffered writes, flushed every FILE_FLUSH_INTERVAL_SECONDS and on errors
     """
     
     def __init__(self, filename, maxBytes=0, backupCount=0, encoding=None, delay=False):
@@ -50,6 +188,11 @@ class TimestampedRotatingFileHandler(logging.handlers.RotatingFileHandler):
         self.encoding = encoding
         self.delay = delay
         
+        # Rollovers reuse the startup timestamp and bump the iteration, which
+        # is tracked here rather than rediscovered from the directory
+        self._timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._iteration = 0
+        
         # Generate initial timestamped filename
         self.current_filename = self._generate_filename()
         
@@ -61,6 +204,100 @@ class TimestampedRotatingFileHandler(logging.handlers.RotatingFileHandler):
             encoding=encoding,
             delay=delay
         )
+        
+        # Running size of the current file so rollover checks need no tell()/stat()
+        self._bytes_written = (
+            os.path.getsize(self.current_filename)
+            if os.path.exists(self.current_filename) else 0
+        )
+        
+        self._flush_stop = threading.Event()
+        threading.Thread(
+            target=self._flush_loop, name="log-file-flush", daemon=True
+        ).start()
+    
+    def _open(self):
+        """Open the current file with a large write buffer."""
+        return open(
+            self.baseFilename, self.mode, buffering=FILE_BUFFER_SIZE,
+            encoding=self.encoding, errors=self.errors
+        )
+    
+    def _flush_loop(self):
+        """Push buffered records to disk periodically until the handler closes."""
+        while not self._flush_stop.wait(FILE_FLUSH_INTERVAL_SECONDS):
+            self.flush()
+    
+    def close(self):
+        self._flush_stop.set()
+        super().close()
+    
+    def _should_rollover(self, msg_len):
+        """
+        Check the size limit against the in-memory byte counter.
+        
+        An empty file is never rolled over before its first record, so an
+        oversized record still lands in a file of its own.
+        """
+        return (
+            self.maxBytes > 0
+            and self._bytes_written > 0
+            and self._bytes_written + msg_len >= self.maxBytes
+        )
+    
+    def shouldRollover(self, record):
+        """Same check as _write applies; emitting records never calls this."""
+        return self._should_rollover(len(self.format(record) + self.terminator))
+    
+    def handle(self, record):
+        """
+        Filter and emit the record, holding the handler lock only for the write.
+        
+        Formatting (JSON encoding in particular) is the expensive part and
+        touches nothing shared, so it runs before the lock is taken.
+        """
+        rv = self.filter(record)
+        if isinstance(rv, logging.LogRecord):
+            record = rv  # Python 3.12+ filters may return a replacement record
+        if rv:
+            try:
+                msg = self.format(record) + self.terminator
+            except Exception:
+                self.handleError(record)
+                return rv
+            with self.lock:
+                self._write(msg, record)
+        return rv
+    
+    def emit(self, record):
+        """Write the record, formatting it once for both the size check and the write."""
+        try:
+            msg = self.format(record) + self.terminator
+        except Exception:
+            self.handleError(record)
+            return
+        self._write(msg, record)
+    
+    def _write(self, msg, record):
+        """
+        Roll over if needed, then write an already formatted record.
+        
+        Sizes are counted in characters, which is exact for ASCII/JSON output and
+        close enough for rollover purposes otherwise.
+        """
+        try:
+            if self._should_rollover(len(msg)):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(msg)
+            if record.levelno >= logging.ERROR:
+                self.flush()
+            self._bytes_written += len(msg)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
     
     def _generate_filename(self, iteration=0):
         """
@@ -72,41 +309,10 @@ class TimestampedRotatingFileHandler(logging.handlers.RotatingFileHandler):
         Returns:
             str: Generated filename
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
         if iteration == 0:
-            return f"{self.base_filename}_{timestamp}.log"
+            return f"{self.base_filename}_{self._timestamp}.log"
         else:
-            return f"{self.base_filename}_{timestamp}_{iteration}.log"
-    
-    def _get_next_iteration(self):
-        """
-        Get the next iteration number for rollover.
-        
-        Returns:
-            int: Next iteration number
-        """
-        # Extract timestamp from current filename
-        base_name = os.path.splitext(self.current_filename)[0]
-        timestamp_part = base_name.split('_')[-2] + '_' + base_name.split('_')[-1]
-        
-        # Find all existing files with the same timestamp
-        pattern = f"{self.base_filename}_{timestamp_part}_*.log"
-        existing_files = glob.glob(os.path.join(os.path.dirname(self.current_filename), pattern))
-        
-        # Find the highest iteration number
-        max_iteration = -1
-        for file_path in existing_files:
-            filename = os.path.basename(file_path)
-            parts = filename.split('_')
-            if len(parts) >= 4:  # base_timestamp_iteration.log
-                try:
-                    iteration = int(parts[-2])
-                    max_iteration = max(max_iteration, iteration)
-                except (ValueError, IndexError):
-                    continue
-        
-        return max_iteration + 1
+            return f"{self.base_filename}_{self._timestamp}_{iteration}.log"
     
     def doRollover(self):
         """
@@ -118,11 +324,13 @@ class TimestampedRotatingFileHandler(logging.handlers.RotatingFileHandler):
             self.stream = None
         
         # Generate new filename with incremented iteration
-        next_iteration = self._get_next_iteration()
-        new_filename = self._generate_filename(next_iteration)
+        self._iteration += 1
+        new_filename = self._generate_filename(self._iteration)
         
-        # Update current filename
+        # Update current filename; _open() reads baseFilename
         self.current_filename = new_filename
+        self.baseFilename = os.path.abspath(new_filename)
+        self._bytes_written = 0
         
         # Clean up old files if backupCount is set
         if self.backupCount > 0:
@@ -139,16 +347,23 @@ class TimestampedRotatingFileHandler(logging.handlers.RotatingFileHandler):
         """
         try:
             # Get all log files for this service
-            log_dir = os.path.dirname(self.current_filename)
-            pattern = f"{self.base_filename}_*.log"
-            all_files = glob.glob(os.path.join(log_dir, pattern))
+            # scandir's DirEntry caches stat data, so this is one pass over
+            # the directory instead of glob plus a getmtime per file
+            log_dir = os.path.dirname(self.current_filename) or "."
+            prefix = os.path.basename(self.base_filename) + "_"
+            with os.scandir(log_dir) as it:
+                all_files = [
+                    (entry.stat(follow_symlinks=False).st_mtime, entry.path)
+                    for entry in it
+                    if entry.name.startswith(prefix) and entry.name.endswith(".log")
+                ]
             
             # Sort by modification time (newest first)
-            all_files.sort(key=lambda x: os.path.getmtime(x), reverse=True)
+            all_files.sort(reverse=True)
             
             # Remove files beyond backupCount
             files_to_remove = all_files[self.backupCount:]
-            for file_path in files_to_remove:
+            for _, file_path in files_to_remove:
                 try:
                     os.remove(file_path)
                 except OSError:
@@ -156,19 +371,6 @@ class TimestampedRotatingFileHandler(logging.handlers.RotatingFileHandler):
                     
         except Exception:
             pass  # Ignore cleanup errors
-    
-    def emit(self, record):
-        """
-        Emit a log record.
-        Override to ensure we're using the current filename.
-        """
-        try:
-            if self.shouldRollover(record):
-                self.doRollover()
-            
-            super().emit(record)
-        except Exception:
-            self.handleError(record)
 
 
 class RequestContextFilter(logging.Filter):
@@ -207,7 +409,14 @@ class RequestContextFilter(logging.Filter):
         Returns:
             bool: Always True to allow the record to be processed
         """
+        # Context is attached once, on the thread that logged the record;
+        # later passes (another handler, a queue listener) must not replace
+        # it with the empty defaults seen outside the request
+        if "request_id" in record.__dict__:
+            return True
         try:
+            if FLASK_AVAILABLE is None:
+                _load_flask()
             if FLASK_AVAILABLE and has_request_context():
                 self._add_flask_context(record)
             else:
@@ -225,57 +434,56 @@ class RequestContextFilter(logging.Filter):
     def _add_flask_context(self, record: logging.LogRecord) -> None:
         """Add Flask request context information to the log record."""
         try:
-            # Request ID from Flask's g object
-            setattr(record, "request_id", getattr(g, "request_id", ""))
-            
-            # HTTP method and path
-            setattr(record, "method", getattr(request, "method", ""))
-            setattr(record, "path", getattr(request, "path", ""))
-            
-            # Client IP with proxy support
-            remote_addr = self._get_client_ip()
-            setattr(record, "remote_addr", remote_addr)
-            
-            # User agent
-            user_agent = self._get_user_agent()
-            setattr(record, "user_agent", user_agent)
-            
+            # The values are fixed for the life of a request, so resolve them
+            # on the first record and reuse them from flask.g afterwards
+            context = g.get("_log_context")
+            if context is None:
+                context = {
+                    "request_id": g.get("request_id", ""),
+                    "method": request.method,
+                    "path": request.path,
+                    "remote_addr": self._get_client_ip(),
+                    "user_agent": self._get_user_agent(),
+                }
+                g._log_context = context
+            record.__dict__.update(context)
         except Exception:
             # Fallback to default context
             self._add_default_context(record)
     
     def _add_default_context(self, record: logging.LogRecord) -> None:
         """Add default empty context when Flask context is unavailable."""
-        for attr, default_value in self._default_attrs.items():
-            setattr(record, attr, default_value)
+        record.__dict__.update(self._default_attrs)
     
     def _get_client_ip(self) -> str:
         """
         Extract client IP address with support for proxy headers.
         
+        Only called from _add_flask_context, inside an active request and
+        under its exception guard, so no try/except is needed here.
+        
         Returns:
             str: Client IP address or empty string if unavailable
         """
-        try:
-            if not request:
-                return ""
-            
-            # Check for proxy headers first
-            forwarded_for = request.headers.get("X-Forwarded-For", "").strip()
-            if forwarded_for:
-                # Take the first IP in case of multiple proxies
-                return forwarded_for.split(",")[0].strip()
-            
-            # Check other common proxy headers
-            real_ip = request.headers.get("X-Real-IP", "").strip()
-            if real_ip:
-                return real_ip
-            
-            # Fallback to direct connection
-            return getattr(request, "remote_addr", "") or ""
-            
-        except Exception:
+        headers = getattr(request, "headers", None)
+        if headers is None:
             return ""
+        
+        # Check for proxy headers first
+        forwarded_for = headers.get("X-Forwarded-For")
+        if forwarded_for:
+            # Take the first IP in case of multiple proxies
+            client_ip = forwarded_for.partition(",")[0].strip()
+            if client_ip:
+                return client_ip
+        
+        # Check other common proxy headers
+        real_ip = headers.get("X-Real-IP", "").strip()
+        if real_ip:
+            return real_ip
+        
+        # Fallback to direct connection
+        return getattr(request, "remote_addr", "") or ""
     
     def _get_user_agent(self) -> str:
         """
@@ -284,15 +492,8 @@ class RequestContextFilter(logging.Filter):
         Returns:
             str: User agent string or empty string if unavailable
         """
-        try:
-            if not request:
-                return ""
-            
-            user_agent = getattr(request, "user_agent", None)
-            return str(user_agent) if user_agent else ""
-            
-        except Exception:
-            return ""
+        user_agent = getattr(request, "user_agent", None)
+        return str(user_agent) if user_agent else ""
 
 
 class JSONFormatter(logging.Formatter):
@@ -302,6 +503,20 @@ class JSONFormatter(logging.Formatter):
         super().__init__()
         self.static_fields = static_fields or {}
         self._validate_static_fields()
+        # Record attributes that must never be copied as dynamic fields
+        self._skip_keys = RESERVED_FIELDS | BASE_ENTRY_FIELDS | frozenset(self.static_fields)
+        # Static fields never change, so they are encoded once and spliced
+        # into each output object as a pre-rendered '"k":v,...' fragment.
+        # Fields named like an entry key would duplicate that key, so they
+        # are merged into the entry dict instead and override it
+        self._static_overrides = {
+            key: value for key, value in self.static_fields.items()
+            if key in _ENTRY_KEYS
+        }
+        self._static_json = _dumps({
+            key: value for key, value in self.static_fields.items()
+            if key not in self._static_overrides
+        })[1:-1]
     
     def _validate_static_fields(self) -> None:
         """Validate that static fields are JSON serializable."""
@@ -313,50 +528,82 @@ class JSONFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         """Format log record as JSON."""
         try:
+            # The common record carries no extras and no exception; its shape
+            # is fixed, so it is rendered directly without building a dict
+            if (not record.exc_info and not record.exc_text and not self._static_overrides
+                    and self._skip_keys.issuperset(record.__dict__)):
+                return self._with_static_fields(self._encode_base_entry(record))
+            
             # Build base log structure
             log_entry = self._build_base_entry(record)
             
-            # Add static fields
-            log_entry.update(self.static_fields)
-            
             # Add dynamic fields from record
             self._add_dynamic_fields(log_entry, record)
             
             # Add exception information if present
             self._add_exception_info(log_entry, record)
             
-            return json.dumps(log_entry, ensure_ascii=False, default=str)
+            log_entry.update(self._static_overrides)
+            return self._with_static_fields(_dumps(log_entry))
             
         except Exception as e:
             # Fallback to basic string representation
             return self._create_fallback_entry(record, str(e))
     
+    def _with_static_fields(self, encoded: str) -> str:
+        """Append the pre-encoded static fields to an encoded JSON object."""
+        if not self._static_json:
+            return encoded
+        return f"{encoded[:-1]},{self._static_json}}}"
+    
     def _build_base_entry(self, record: logging.LogRecord) -> Dict[str, Any]:
         """Build the base log entry structure."""
+        # Context attributes are plain instance data set by RequestContextFilter
+        attrs = record.__dict__
         return {
-            "timestamp": datetime.utcnow().isoformat(timespec="milliseconds") + "Z",
+            "timestamp": _format_timestamp(record),
             "level": record.levelname,
             "logger": record.name,
-            "message": record.getMessage(),
-            "request_id": getattr(record, "request_id", ""),
-            "method": getattr(record, "method", ""),
-            "path": getattr(record, "path", ""),
-            "remote_addr": getattr(record, "remote_addr", ""),
-            "user_agent": getattr(record, "user_agent", ""),
+            "message": _record_message(record),
+            "request_id": attrs.get("request_id", ""),
+            "method": attrs.get("method", ""),
+            "path": attrs.get("path", ""),
+            "remote_addr": attrs.get("remote_addr", ""),
+            "user_agent": attrs.get("user_agent", ""),
         }
     
+    def _encode_base_entry(self, record: logging.LogRecord) -> str:
+        """Render the base entry straight to JSON, matching _dumps(_build_base_entry(record))."""
+        attrs = record.__dict__
+        try:
+            return (
+                f'{{"timestamp":"{_format_timestamp(record)}",'
+                f'"level":{_encode_str(record.levelname)},'
+                f'"logger":{_encode_str(record.name)},'
+                f'"message":{_encode_str(_record_message(record))},'
+                f'"request_id":{_encode_str(attrs.get("request_id", ""))},'
+                f'"method":{_encode_str(attrs.get("method", ""))},'
+                f'"path":{_encode_str(attrs.get("path", ""))},'
+                f'"remote_addr":{_encode_str(attrs.get("remote_addr", ""))},'
+                f'"user_agent":{_encode_str(attrs.get("user_agent", ""))}}}'
+            )
+        except TypeError:
+            # A non-string context value (e.g. an int request_id passed as
+            # an extra) keeps its JSON type via the generic encoder
+            return _dumps(self._build_base_entry(record))
+    
     def _add_dynamic_fields(self, log_entry: Dict[str, Any], record: logging.LogRecord) -> None:
         """Add dynamic fields from the log record."""
-        for key, value in record.__dict__.items():
-            if key in RESERVED_FIELDS or key in log_entry:
-                continue
+        # One C-level set difference instead of a membership test per attribute
+        attrs = record.__dict__
+        for key in attrs.keys() - self._skip_keys:
+            value = attrs[key]
             
-            try:
-                # Test JSON serializability
-                json.dumps(value)
+            # Scalars and containers go straight through (the final dumps uses
+            # default=str for nested oddities); anything else is stringified
+            if isinstance(value, _JSON_PASSTHROUGH_TYPES):
                 log_entry[key] = value
-            except (TypeError, ValueError):
-                # Convert non-serializable values to strings
+            else:
                 log_entry[key] = str(value)
     
     def _add_exception_info(self, log_entry: Dict[str, Any], record: logging.LogRecord) -> None:
@@ -366,103 +613,124 @@ class JSONFormatter(logging.Formatter):
                 log_entry["exception"] = self.formatException(record.exc_info)
             except Exception:
                 log_entry["exception"] = "Failed to format exception"
+        elif record.exc_text:
+            # Pre-rendered by StructuredQueueHandler before queueing
+            log_entry["exception"] = record.exc_text
     
     def _create_fallback_entry(self, record: logging.LogRecord, error: str) -> str:
         """Create a fallback log entry when JSON formatting fails."""
         fallback = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": _format_timestamp(record),
             "level": "ERROR",
             "logger": "logging.formatter",
             "message": f"Failed to format log record: {error}",
             "original_message": getattr(record, "message", str(record.msg)),
             "original_level": record.levelname
         }
-        return json.dumps(fallback, ensure_ascii=False)
+        return _dumps(fallback)
 
 
 class GraylogHandler:
     """A wrapper class for Graylog (GELF) handler with enhanced error handling."""
     
+    # How long sending is suspended after a failed emit
+    RETRY_AFTER_SECONDS = 60
+    
     def __init__(self, host: str, port: int, facility: str = "python"):
         self.host = host
         self.port = port
         self.facility = facility
         self._handler = None
-        self._is_available = False
-        self._last_check = 0
-        self._check_interval = 300  # 5 minutes
+        # UDP is fire-and-forget, so there is nothing to probe up front;
+        # availability is inferred from send failures instead
+        self._is_available = True
+        self._dead_until = 0.0
     
     def create_handler(self) -> Optional[logging.Handler]:
-        """Create and return a Graylog handler if available."""
+        """Create and return a Graylog handler that backs off after send failures."""
         try:
-            if self._test_connection():
-                # Try to import graypy (install with: pip install graypy)
-                try:
-                    import graypy
-                    self._handler = graypy.GELFUDPHandler(
-                        self.host, 
-                        self.port,
-                        facility=self.facility
-                    )
-                    self._is_available = True
-                    return self._handler
-                except ImportError:
-                    # Fallback to basic UDP handler if graypy not available
-                    self._handler = logging.handlers.DatagramHandler(self.host, self.port)
-                    self._is_available = True
-                    return self._handler
-            else:
-                self._is_available = False
-                return None
+            # Try to import graypy (install with: pip install graypy)
+            try:
+                import graypy
+                handler_cls = graypy.GELFUDPHandler
+                kwargs = {"facility": self.facility}
+            except ImportError:
+                # Fallback to basic UDP handler if graypy not available
+                handler_cls = logging.handlers.DatagramHandler
+                kwargs = {}
+            
+            owner = self
+            
+            class _BackoffHandler(handler_cls):
+                def emit(self, record):
+                    if time.time() >= owner._dead_until:
+                        super().emit(record)
+                
+                def handleError(self, record):
+                    owner._mark_unavailable()
+            
+            self._handler = _BackoffHandler(self.host, self.port, **kwargs)
+            return self._handler
         except Exception as e:
             logging.getLogger("logging.graylog").warning(f"Failed to create Graylog handler: {e}")
             self._is_available = False
             return None
     
-    def _test_connection(self) -> bool:
-        """Test if Graylog server is reachable."""
-        current_time = time.time()
-        if current_time - self._last_check < self._check_interval and self._is_available:
-            return True
-        
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.settimeout(5)
-            sock.connect((self.host, self.port))
-            sock.close()
-            self._last_check = current_time
-            return True
-        except Exception:
-            self._last_check = current_time
-            return False
+    def _mark_unavailable(self) -> None:
+        """Suspend sending for RETRY_AFTER_SECONDS after a failed emit."""
+        self._dead_until = time.time() + self.RETRY_AFTER_SECONDS
     
     def is_healthy(self) -> bool:
         """Check if Graylog handler is healthy."""
-        return self._is_available
+        return self._is_available and time.time() >= self._dead_until
+
+
+# Manager whose listener thread and handlers currently serve the root logger
+_active_manager: Optional["LoggerManager"] = None
+
+
+def _shutdown_active_manager() -> None:
+    """Drain and stop the active manager's background logging at exit."""
+    if _active_manager is not None:
+        _active_manager.shutdown()
+
+
+atexit.register(_shutdown_active_manager)
 
 
 class LoggerManager:
     """Central manager for logging configuration and Graylog integration."""
     
     def __init__(self):
-        self._loggers: Dict[str, logging.Logger] = {}
+        # The root logger is a process-wide singleton; resolve it once
+        self._root = logging.getLogger()
         self._graylog_handler: Optional[GraylogHandler] = None
         self._is_configured = False
         self._config: Dict[str, Any] = {}
+        self._sanitized_config: Dict[str, Any] = {}
+        self._resolved_log_dir = self._resolve_log_dir()
+        # Shared by every handler that renders request context, so each
+        # record is enriched once per handler rather than once per logger
+        self._request_filter = RequestContextFilter()
+        # File and Graylog handlers do blocking I/O; they are served by a
+        # single background QueueListener instead of the calling thread
+        self._background_handlers: List[logging.Handler] = []
+        self._file_handler: Optional[TimestampedRotatingFileHandler] = None
+        self._queue_listener: Optional[logging.handlers.QueueListener] = None
     
 
+    def _resolve_log_dir(self) -> str:
+        """Absolute log directory from config (relative paths are under the project root)."""
+        log_dir = self._config.get("log_directory", "logs")
+        if not os.path.isabs(log_dir):
+            project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+            log_dir = os.path.join(project_root, log_dir)
+        return log_dir
+    
     def _configure_file_logging(self) -> None:
         """Configure file logging with timestamped rotation"""
         try:
-            # Get log directory from config or use default
-            log_dir = self._config.get("log_directory", "logs")
-            
-            # Create absolute path
-            if not os.path.isabs(log_dir):
-                # Create logs directory relative to project root
-                project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-                log_dir = os.path.join(project_root, log_dir)
-            
+            log_dir = self._resolved_log_dir
             os.makedirs(log_dir, exist_ok=True)
             
             # Create base log filename (without extension)
@@ -485,15 +753,12 @@ class LoggerManager:
             level = getattr(logging, self._config.get("level", "INFO").upper())
             file_handler.setLevel(level)
             
-            # Create formatter
-            formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
-            )
-            file_handler.setFormatter(formatter)
+            # Shared formatter; renders the timestamp once per second
+            file_handler.setFormatter(FILE_TEXT_FORMATTER)
             
-            # Add to root logger
-            logging.getLogger().addHandler(file_handler)
+            # Served by the background listener (see _start_background_logging)
+            self._background_handlers.append(file_handler)
+            self._file_handler = file_handler
             
             # Log the configuration
             print(f"Timestamped file logging configured: {file_handler.current_filename}")
@@ -507,6 +772,7 @@ class LoggerManager:
         try:
             self._config = config or {}
             self._validate_config()
+            self._resolved_log_dir = self._resolve_log_dir()
             self._reset_logging()
             self._configure_levels()
             self._configure_console_logging()
@@ -515,12 +781,14 @@ class LoggerManager:
             if self._config.get("graylog"):
                 self._configure_graylog()
             
+            self._start_background_logging()
             self._configure_squelching()
             self._is_configured = True
             
-            # Log configuration summary
-            sanitized = self._sanitize_config_for_logging()
-            logging.info(f"Logging configured: {sanitized}")
+            # Log configuration summary; config is fixed from here on, so the
+            # sanitized view is computed once and reused by diagnostics
+            self._sanitized_config = self._sanitize_config_for_logging()
+            logging.info(f"Logging configured: {self._sanitized_config}")
             
         except Exception as e:
             raise LoggingError(f"Failed to configure logging: {e}")
@@ -546,17 +814,61 @@ class LoggerManager:
                 if field not in graylog_config:
                     raise LoggingError(f"Missing required Graylog field: {field}")
     
+    def _start_background_logging(self) -> None:
+        """
+        Route the I/O-bound handlers through one queue and listener thread.
+        
+        Request threads only enqueue records. Request context is captured by
+        the QueueHandler at enqueue time, since Flask's request globals are
+        not visible from the listener thread.
+        """
+        if not self._background_handlers:
+            return
+        log_queue = queue.SimpleQueue()
+        queue_handler = StructuredQueueHandler(log_queue)
+        queue_handler.addFilter(self._request_filter)
+        self._queue_listener = logging.handlers.QueueListener(
+            log_queue, *self._background_handlers, respect_handler_level=True
+        )
+        self._queue_listener.start()
+        self._root.addHandler(queue_handler)
+    
+    def shutdown(self) -> None:
+        """Flush queued records and stop the background listener."""
+        listener, self._queue_listener = self._queue_listener, None
+        if listener is not None:
+            try:
+                listener.stop()
+            except Exception:
+                pass  # Shutdown must never raise from logging
+        while self._background_handlers:
+            try:
+                self._background_handlers.pop().close()
+            except Exception:
+                pass
+        self._file_handler = None
+    
     def _reset_logging(self) -> None:
         """Reset logging configuration."""
-        root_logger = logging.getLogger()
-        for handler in root_logger.handlers[:]:
-            root_logger.removeHandler(handler)
-        root_logger.setLevel(logging.NOTSET)
+        global _active_manager
+        # The root logger is shared, so the background listener and file
+        # handler of whichever manager configured it last are stopped too
+        previous, _active_manager = _active_manager, self
+        if previous is not None and previous is not self:
+            previous.shutdown()
+        self.shutdown()
+        for handler in self._root.handlers:
+            try:
+                handler.close()
+            except Exception:
+                pass  # Never let a misbehaving handler block reconfiguration
+        self._root.handlers.clear()
+        self._root.setLevel(logging.NOTSET)
     
     def _configure_levels(self) -> None:
         """Configure logging levels."""
         level = getattr(logging, self._config.get("level", "INFO").upper())
-        logging.getLogger().setLevel(level)
+        self._root.setLevel(level)
     
     def _configure_console_logging(self) -> None:
         """Configure console logging."""
@@ -567,12 +879,11 @@ class LoggerManager:
             static_fields = {"service": self._config.get("service_name", "unknown")}
             formatter = JSONFormatter(static_fields=static_fields)
         else:
-            formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-            )
+            formatter = CONSOLE_TEXT_FORMATTER
         
         console_handler.setFormatter(formatter)
-        logging.getLogger().addHandler(console_handler)
+        console_handler.addFilter(self._request_filter)
+        self._root.addHandler(console_handler)
     
     def _configure_graylog(self) -> None:
         """Configure Graylog integration if specified."""
@@ -594,8 +905,9 @@ class LoggerManager:
                 formatter = JSONFormatter(static_fields=static_fields)
                 graylog_handler.setFormatter(formatter)
                 
-                # Add to root logger
-                logging.getLogger().addHandler(graylog_handler)
+                # Served by the background listener so network I/O never
+                # runs on request threads
+                self._background_handlers.append(graylog_handler)
                 
         except Exception as e:
             logging.getLogger("logging.manager").warning(
@@ -618,13 +930,16 @@ class LoggerManager:
             sanitized["graylog"] = graylog
         return sanitized
     
+    @property
+    def sanitized_config(self) -> Dict[str, Any]:
+        """Configuration applied by the last configure(), without sensitive values."""
+        return self._sanitized_config
+    
     def get_logger(self, name: str) -> logging.Logger:
         """Get or create a logger with the given name."""
-        if name not in self._loggers:
-            logger = logging.getLogger(name)
-            logger.addFilter(RequestContextFilter())
-            self._loggers[name] = logger
-        return self._loggers[name]
+        # logging caches loggers itself; request context is added by the
+        # handler-level filter, so no per-name bookkeeping is needed here
+        return logging.getLogger(name)
     
     def is_configured(self) -> bool:
         """Check if logging is configured."""
@@ -632,43 +947,44 @@ class LoggerManager:
     
     def get_current_log_file(self) -> Optional[str]:
         """Get the current active log file path."""
-        try:
-            for handler in logging.getLogger().handlers:
-                if isinstance(handler, TimestampedRotatingFileHandler):
-                    return handler.current_filename
-        except Exception:
-            pass
+        if self._file_handler is not None:
+            return self._file_handler.current_filename
         return None
     
     def get_log_files_info(self) -> Dict[str, Any]:
         """Get information about all log files."""
         try:
-            log_dir = self._config.get("log_directory", "logs")
-            if not os.path.isabs(log_dir):
-                project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-                log_dir = os.path.join(project_root, log_dir)
-            
+            log_dir = self._resolved_log_dir
             service_name = self._config.get("service_name", "quell-ai")
-            pattern = f"{service_name}_*.log"
-            log_files = glob.glob(os.path.join(log_dir, pattern))
+            prefix = f"{service_name}_"
+            
+            # One scandir pass; DirEntry caches the stat result for reuse below
+            log_files = []
+            try:
+                with os.scandir(log_dir) as it:
+                    for entry in it:
+                        if entry.name.startswith(prefix) and entry.name.endswith(".log"):
+                            try:
+                                log_files.append((entry, entry.stat()))
+                            except OSError:
+                                continue
+            except FileNotFoundError:
+                pass  # No log directory yet means no log files
             
             # Sort by modification time (newest first)
-            log_files.sort(key=lambda x: os.path.getmtime(x), reverse=True)
+            log_files.sort(key=lambda item: item[1].st_mtime, reverse=True)
             
+            current_file = self.get_current_log_file()
             files_info = []
-            for file_path in log_files:
-                try:
-                    stat = os.stat(file_path)
-                    files_info.append({
-                        "filename": os.path.basename(file_path),
-                        "path": file_path,
-                        "size_bytes": stat.st_size,
-                        "size_mb": round(stat.st_size / (1024 * 1024), 2),
-                        "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                        "is_current": file_path == self.get_current_log_file()
-                    })
-                except OSError:
-                    continue
+            for entry, stat in log_files:
+                files_info.append({
+                    "filename": entry.name,
+                    "path": entry.path,
+                    "size_bytes": stat.st_size,
+                    "size_mb": round(stat.st_size / (1024 * 1024), 2),
+                    "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                    "is_current": entry.path == current_file
+                })
             
             return {
                 "log_directory": log_dir,
@@ -683,8 +999,9 @@ class LoggerManager:
         """Perform health check on logging system."""
         health = {
             "configured": self._is_configured,
+            "config": self._sanitized_config,
             "graylog_available": False,
-            "handlers_count": len(logging.getLogger().handlers),
+            "handlers_count": len(self._root.handlers) + len(self._background_handlers),
             "current_log_file": self.get_current_log_file(),
             "log_files_info": self.get_log_files_info()
         }
@@ -694,18 +1011,6 @@ class LoggerManager:
         
         return health
 
-# Optional Flask imports with graceful fallback
-try:
-    from flask import has_request_context, request, g
-    FLASK_AVAILABLE = True
-except ImportError:
-    # Graceful fallback when Flask is not available
-    FLASK_AVAILABLE = False
-    has_request_context = lambda: False
-    request = None
-    g = object()
-
-
 # Global logger manager instance
 logger_manager = LoggerManager()
 
@@ -725,6 +1030,10 @@ def get_log_files_info() -> Dict[str, Any]:
     """Get information about all log files."""
     return logger_manager.get_log_files_info()
 
+def shutdown_logging() -> None:
+    """Flush queued records and stop background logging threads."""
+    logger_manager.shutdown()
+
 def get_logging_health() -> Dict[str, Any]:
     """Get logging system health information."""
     return logger_manager.health_check()
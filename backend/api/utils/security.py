@@ -2,12 +2,52 @@
 Security utilities for password hashing and verification
 """
 import hashlib
+import os
+import re
 import secrets
 import logging
-from typing import Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Current scheme: PBKDF2-HMAC-SHA512 (64-bit word operations, faster per
+# iteration than SHA-256 on 64-bit CPUs) at OWASP's recommended cost.
+# hashlib.pbkdf2_hmac always runs in OpenSSL's C implementation.
+HASH_VERSION = "v2"
+HASH_ALGORITHM = "sha512"
+HASH_ITERATIONS = 210_000
+
+# Legacy salt:hash entries (PBKDF2-HMAC-SHA256); still accepted on login
+LEGACY_HASH_ALGORITHM = "sha256"
+LEGACY_HASH_ITERATIONS = 100_000
+
+# Accepts the common case (ASCII upper, lower and digit present) in one
+# C-level match; anything else falls through to the per-class checks
+_STRENGTH_RE = re.compile(r'(?=.*[A-Z])(?=.*[a-z])(?=.*\d)', re.DOTALL)
+
+# Common weak passwords, rejected case-insensitively
+_COMMON_PASSWORDS = frozenset({
+    'password', '123456', '123456789', 'qwerty', 'abc123',
+    'password123', 'admin', 'letmein', 'welcome', 'monkey'
+})
+
+# pbkdf2_hmac releases the GIL while OpenSSL runs, so batched verification
+# scales across cores with plain threads; created on first use
+_verify_executor: Optional[ThreadPoolExecutor] = None
+_verify_executor_lock = threading.Lock()
+
+
+def _get_verify_executor() -> ThreadPoolExecutor:
+    global _verify_executor
+    with _verify_executor_lock:
+        if _verify_executor is None:
+            _verify_executor = ThreadPoolExecutor(
+                max_workers=os.cpu_count() or 1, thread_name_prefix="pbkdf2"
+            )
+        return _verify_executor
+
 class PasswordManager:
     """Secure password hashing and verification"""
     
@@ -20,7 +60,7 @@ class PasswordManager:
             password: Plain text password
             
         Returns:
-            Hashed password in format: salt:hash
+            Hashed password in format: v2$salt$hash
         """
         try:
             # Generate a random salt
@@ -28,17 +68,16 @@ class PasswordManager:
             
             # Hash the password with PBKDF2
             password_hash = hashlib.pbkdf2_hmac(
-                'sha256',
+                HASH_ALGORITHM,
                 password.encode('utf-8'),
                 salt.encode('utf-8'),
-                100000  # 100,000 iterations
+                HASH_ITERATIONS
             )
             
-            # Return salt:hash format
-            return f"{salt}:{password_hash.hex()}"
+            return f"{HASH_VERSION}${salt}${password_hash.hex()}"
             
         except Exception as e:
-            logger.error(f"Error hashing password: {e}")
+            logger.error("Error hashing password: %s", e)
             raise ValueError("Failed to hash password")
     
     @staticmethod
@@ -48,34 +87,66 @@ class PasswordManager:
         
         Args:
             password: Plain text password to verify
-            hashed_password: Stored hash in format salt:hash
+            hashed_password: Stored hash in format v2$salt$hash (or legacy salt:hash)
             
         Returns:
             True if password matches, False otherwise
         """
         try:
-            # Split salt and hash
-            if ':' not in hashed_password:
+            # Split salt and hash, picking the scheme from the stored format
+            if hashed_password.startswith(f"{HASH_VERSION}$"):
+                parts = hashed_password.split('$')
+                if len(parts) != 3:
+                    logger.warning("Invalid hash format")
+                    return False
+                _, salt, stored_hash = parts
+                algorithm, iterations = HASH_ALGORITHM, HASH_ITERATIONS
+            elif ':' in hashed_password:
+                salt, stored_hash = hashed_password.split(':', 1)
+                algorithm, iterations = LEGACY_HASH_ALGORITHM, LEGACY_HASH_ITERATIONS
+            else:
                 logger.warning("Invalid hash format")
                 return False
-                
-            salt, stored_hash = hashed_password.split(':', 1)
+            
+            # Decode the stored digest up front; a malformed value never matches
+            try:
+                expected = bytes.fromhex(stored_hash)
+            except ValueError:
+                logger.warning("Invalid hash encoding")
+                return False
             
             # Hash the provided password with the same salt
             password_hash = hashlib.pbkdf2_hmac(
-                'sha256',
+                algorithm,
                 password.encode('utf-8'),
                 salt.encode('utf-8'),
-                100000  # Same number of iterations
+                iterations
             )
             
-            # Compare hashes
-            return secrets.compare_digest(password_hash.hex(), stored_hash)
+            # Compare raw digests
+            return secrets.compare_digest(password_hash, expected)
             
         except Exception as e:
-            logger.error(f"Error verifying password: {e}")
+            logger.error("Error verifying password: %s", e)
             return False
     
+    @staticmethod
+    def verify_many(pairs: Iterable[Tuple[str, str]]) -> List[bool]:
+        """
+        Verify many (password, hashed_password) pairs in parallel
+        
+        Args:
+            pairs: Plain text passwords with their stored hashes
+            
+        Returns:
+            Verification results in input order
+        """
+        pairs = list(pairs)
+        if len(pairs) < 2:
+            return [PasswordManager.verify_password(p, h) for p, h in pairs]
+        executor = _get_verify_executor()
+        return list(executor.map(lambda pair: PasswordManager.verify_password(*pair), pairs))
+    
     @staticmethod
     def generate_secure_token(length: int = 32) -> str:
         """
@@ -106,22 +177,20 @@ class PasswordManager:
         if len(password) > 128:
             return False, "Password must be less than 128 characters"
         
-        if not any(c.isupper() for c in password):
-            return False, "Password must contain at least one uppercase letter"
-        
-        if not any(c.islower() for c in password):
-            return False, "Password must contain at least one lowercase letter"
-        
-        if not any(c.isdigit() for c in password):
-            return False, "Password must contain at least one number"
+        # Per-class scans only run when the fast match fails, to tell the
+        # user which class is missing (or to accept non-ASCII letters)
+        if not _STRENGTH_RE.match(password):
+            if not any(c.isupper() for c in password):
+                return False, "Password must contain at least one uppercase letter"
+            
+            if not any(c.islower() for c in password):
+                return False, "Password must contain at least one lowercase letter"
+            
+            if not any(c.isdigit() for c in password):
+                return False, "Password must contain at least one number"
         
         # Check for common weak passwords
-        common_passwords = [
-            'password', '123456', '123456789', 'qwerty', 'abc123',
-            'password123', 'admin', 'letmein', 'welcome', 'monkey'
-        ]
-        
-        if password.lower() in common_passwords:
+        if password.lower() in _COMMON_PASSWORDS:
             return False, "Password is too common, please choose a stronger password"
         
         return True, "Password is valid"
@@ -1,8 +1,37 @@
 import re
-from typing import Iterable
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
+
+
+@lru_cache(maxsize=256)
+def _compile(pattern: str) -> "re.Pattern[str]":
+    return re.compile(pattern, re.IGNORECASE)
+
+
+@lru_cache(maxsize=64)
+def _compile_matchers(patterns: Tuple[str, ...]) -> Tuple[Optional["re.Pattern[str]"], Tuple["re.Pattern[str]", ...]]:
+    # Patterns without groups are fused into one alternation that scans the
+    # text once. Patterns with groups are matched one at a time: the union
+    # would renumber their groups, so a backreference such as \1 would
+    # silently refer to another pattern's group
+    compiled = [_compile(p) for p in patterns]
+    plain = [p for p, c in zip(patterns, compiled) if not c.groups]
+    separate = tuple(c for c in compiled if c.groups)
+    if len(plain) < 2:
+        return None, tuple(_compile(p) for p in plain) + separate
+    try:
+        union = re.compile("|".join(f"(?:{p})" for p in plain), re.IGNORECASE)
+    except re.error:
+        # e.g. inline global flags, which are only valid at the start of a pattern
+        return None, tuple(_compile(p) for p in plain) + separate
+    return union, separate
+
 
 def contains_sensitive(text: str, patterns: Iterable[str]) -> bool:
-    for p in patterns:
-        if re.search(p, text, flags=re.IGNORECASE):
-            return True
-    return False
+    patterns = tuple(patterns)
+    if not patterns:
+        return False
+    union, separate = _compile_matchers(patterns)
+    if union is not None and union.search(text):
+        return True
+    return any(matcher.search(text) for matcher in separate)
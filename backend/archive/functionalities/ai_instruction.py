@@ -1,22 +1,29 @@
 from datetime import datetime, timedelta
+from typing import Optional
 
 from sqlalchemy import (
     Boolean,
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     JSON,
     String,
     Text,
 )
-from sqlalchemy.sql import func
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.sql import and_, func, or_
 
 from functionalities.base import Base
 
 
 class AIInstruction(Base):
     __tablename__ = "ai_instructions"
+    # Active-instruction lookups filter on user, status and expiry together
+    __table_args__ = (
+        Index("idx_ai_instructions_user_status_expires", "user_id", "status", "expires_at"),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -53,8 +60,11 @@ class AIInstruction(Base):
     escalation_policy = Column(String(50), nullable=True)
     follow_up_action = Column(JSON, nullable=True)
 
+    @hybrid_property
     def is_active(self) -> bool:
-        now = datetime.utcnow()
+        return self.is_active_at(datetime.utcnow())
+
+    def is_active_at(self, now: datetime) -> bool:
         if self.status != "active":
             return False
         if self.expires_at and now > self.expires_at:
@@ -65,6 +75,23 @@ class AIInstruction(Base):
             return False
         return True
 
+    @is_active.expression
+    def is_active(cls):
+        # SQL form of the same rules, so "active" filtering runs in the
+        # database (and can use ix_ai_user_status_expires). The clock is
+        # read when the query is built, matching the naive-UTC columns.
+        now = datetime.utcnow()
+        return and_(
+            cls.status == "active",
+            or_(cls.expires_at.is_(None), cls.expires_at >= now),
+            or_(cls.auto_archive_at.is_(None), cls.auto_archive_at >= now),
+            or_(
+                cls.max_usage.is_(None),
+                cls.max_usage == 0,
+                cls.usage_count < cls.max_usage,
+            ),
+        )
+
     def mark_used(self) -> None:
         self.usage_count += 1
         self.last_triggered_at = datetime.utcnow()
@@ -72,7 +99,8 @@ class AIInstruction(Base):
             self.status = "completed"
             self.completed_at = datetime.utcnow()
 
-    def to_dict(self):
+    def to_dict(self, now: Optional[datetime] = None):
+        """Serialise; pass ``now`` when serialising many rows to read the clock once."""
         return {
             "id": self.id,
             "title": self.title,
@@ -97,7 +125,7 @@ class AIInstruction(Base):
             if self.auto_archive_at
             else None,
             "created_at": self.created_at.isoformat() if self.created_at else None,
-            "is_active": self.is_active(),
+            "is_active": self.is_active_at(now or datetime.utcnow()),
             "applies_to_documents": self.applies_to_documents,
             "escalation_policy": self.escalation_policy,
             "follow_up_action": self.follow_up_action or {},
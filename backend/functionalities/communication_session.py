@@ -9,6 +9,7 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     JSON,
     String,
@@ -72,16 +73,26 @@ class CommunicationSession(Base):
         "polymorphic_identity": "session",
     }
 
+    # Per-user history (ordered by start) and per-user status filters
+    __table_args__ = (
+        Index("ix_sessions_user_started", "user_id", "started_at"),
+        Index("ix_sessions_user_status", "user_id", "status"),
+    )
+
+    # to_dict() serialises both, so they are batch-loaded with one extra
+    # SELECT ... IN per query instead of one lazy load per session (N+1)
     participants = relationship(
         "SessionParticipant",
         back_populates="session",
         cascade="all, delete-orphan",
+        lazy="selectin",
     )
     transcript = relationship(
         "SessionTranscript",
         back_populates="session",
         cascade="all, delete-orphan",
         uselist=False,
+        lazy="selectin",
     )
     messages = relationship(
         "SessionMessage",
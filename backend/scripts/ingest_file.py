@@ -22,6 +22,7 @@ from api.utils.nlp_utils import detect_language, translate_to_english  # noqa: E
 from api.utils.analytics import analyze_text, analyze_table, analyze_json  # noqa: E402
 from api.utils.metadata_extractor import build_vector_metadata, extract_key_concepts  # noqa: E402
 from api.models.ollama_service import OllamaService  # noqa: E402
+from api.services.ai_services import get_service  # noqa: E402
 
 
 def _get_upload_directory() -> Path:
@@ -221,7 +222,7 @@ def ingest_single_file(
                         }
                 print('test')
                 # Prefer app-managed Ollama if available
-                svc = app.config.get("OLLAMA_SERVICE")
+                svc = get_service(app, "OLLAMA_SERVICE")
                 if svc is not None:
                     ollama_service = svc
         except Exception as exc:
@@ -4,7 +4,12 @@ Test script for the new timestamped logging system
 """
 import sys
 import os
+import io
+import json
 import time
+import logging
+import logging.handlers
+import queue
 from pathlib import Path
 
 # Add the project root to Python path
@@ -12,6 +17,7 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from api.utils.logging import configure_logging, get_logger, get_current_log_file, get_log_files_info, get_logging_health
+from api.utils.logging import JSONFormatter, StructuredQueueHandler
 
 def test_timestamped_logging():
     """Test the timestamped logging functionality"""
@@ -75,5 +81,33 @@ def test_timestamped_logging():
     
     print("\n✅ Timestamped logging test completed!")
 
+def test_exception_survives_queue():
+    """Records logged through the background queue keep a structured exception field"""
+    
+    stream = io.StringIO()
+    json_handler = logging.StreamHandler(stream)
+    json_handler.setFormatter(JSONFormatter())
+    
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, json_handler)
+    logger = logging.getLogger("test_logging.queue")
+    logger.propagate = False
+    queue_handler = StructuredQueueHandler(log_queue)
+    logger.addHandler(queue_handler)
+    listener.start()
+    try:
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("Failed for %s", "user-1")
+    finally:
+        listener.stop()
+        logger.removeHandler(queue_handler)
+    
+    entry = json.loads(stream.getvalue())
+    assert entry["message"] == "Failed for user-1"
+    assert "ValueError: boom" in entry["exception"]
+    assert "Traceback" not in entry["message"]
+
 if __name__ == "__main__":
     test_timestamped_logging()
@@ -0,0 +1,59 @@
+"""
+Tests for password hashing and verification
+"""
+import hashlib
+import logging
+import secrets
+
+from api.utils.security import (
+    PasswordManager,
+    LEGACY_HASH_ALGORITHM,
+    LEGACY_HASH_ITERATIONS,
+)
+
+
+def _legacy_hash(password: str) -> str:
+    """Build a stored hash in the legacy salt:hash format"""
+    salt = secrets.token_hex(32)
+    digest = hashlib.pbkdf2_hmac(
+        LEGACY_HASH_ALGORITHM, password.encode('utf-8'), salt.encode('utf-8'), LEGACY_HASH_ITERATIONS
+    )
+    return f"{salt}:{digest.hex()}"
+
+
+def test_v2_round_trip():
+    """New hashes use the v2 format and verify only the original password"""
+    hashed = PasswordManager.hash_password("Correct-Horse-1")
+    assert hashed.startswith("v2$")
+    assert PasswordManager.verify_password("Correct-Horse-1", hashed)
+    assert not PasswordManager.verify_password("wrong-password", hashed)
+
+
+def test_legacy_hash_still_verifies():
+    """Stored legacy salt:hash entries are still accepted"""
+    hashed = _legacy_hash("Legacy-Pass-2")
+    assert PasswordManager.verify_password("Legacy-Pass-2", hashed)
+    assert not PasswordManager.verify_password("wrong-password", hashed)
+
+
+def test_malformed_hashes_are_rejected(caplog):
+    """Malformed stored hashes fail verification with a warning, not an error"""
+    with caplog.at_level(logging.WARNING, logger="api.utils.security"):
+        for hashed in ("v2$bad", "v2$a$b$c", "no-separator", "salt:not-hex", "v2$salt$not-hex"):
+            assert not PasswordManager.verify_password("anything", hashed)
+    assert caplog.records
+    assert all(record.levelno == logging.WARNING for record in caplog.records)
+
+
+def test_verify_many_keeps_input_order():
+    """Batched verification returns one result per pair, in input order"""
+    v2_hash = PasswordManager.hash_password("First-Pass-3")
+    legacy_hash = _legacy_hash("Second-Pass-4")
+    results = PasswordManager.verify_many([
+        ("First-Pass-3", v2_hash),
+        ("wrong-password", v2_hash),
+        ("Second-Pass-4", legacy_hash),
+        ("anything", "v2$bad"),
+    ])
+    assert results == [True, False, True, False]
+    assert PasswordManager.verify_many([]) == []
@@ -0,0 +1,23 @@
+"""
+Tests for the sensitive-content blocklist matcher
+"""
+import re
+
+from api.utils.validation import contains_sensitive
+
+
+def test_matches_any_pattern():
+    """Text matching any blocklist entry is flagged, case-insensitively"""
+    patterns = [r"\bssn\b", r"password", r"\d{4}-\d{4}-\d{4}-\d{4}"]
+    assert contains_sensitive("my PASSWORD is hunter2", patterns)
+    assert contains_sensitive("card 1234-5678-9012-3456", patterns)
+    assert not contains_sensitive("nothing to see here", patterns)
+    assert not contains_sensitive("anything", [])
+
+
+def test_backreference_patterns_keep_their_groups():
+    """Numbered backreferences refer to their own pattern's group"""
+    assert re.search(r"(a)\1", "aa")
+    assert contains_sensitive("aa", ["(x)", r"(a)\1"])
+    assert contains_sensitive("aa", ["plain", r"(a)\1"])
+    assert not contains_sensitive("ab", ["(x)", r"(a)\1"])
@@ -2,14 +2,44 @@ import pandas as pd
 import numpy as np
 import json
 import random
+import hashlib
 from pathlib import Path
 from datetime import datetime, date
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, Iterable, List, Tuple
 import re
+from functools import lru_cache
 import argparse
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 
 import sys
 
+# Optional: PyArrow's multithreaded CSV parser for full-file reads
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Optional: orjson's C encoder for the per-example JSON answers
+try:
+    import orjson
+
+    def _dumps_indented(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+    def _encode_line(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+except ImportError:
+    orjson = None
+
+    def _dumps_indented(obj: Any) -> str:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+
+    def _encode_line(obj: Any) -> bytes:
+        return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+
 # Base directory of this script
 exe_dir = Path(__file__).resolve().parent
 print(exe_dir)
@@ -22,38 +52,70 @@ print(exe_dir)
 # 2. LOAD LARGE DATASETS
 # ============================================
 
-def load_large_datasets():
-    """Load large datasets with proper handling"""
-    datasets = {}
-    
-    # Brazilian E-commerce (100+ MB, multi-file)
+def _read_full_csv(path, **kwargs) -> pd.DataFrame:
+    """Read a whole CSV, using the PyArrow engine when installed.
+
+    The PyArrow engine does not support ``nrows``; sampled reads keep the
+    default C engine.
+    """
+    if PYARROW_AVAILABLE:
+        return pd.read_csv(path, engine='pyarrow', **kwargs)
+    return pd.read_csv(path, **kwargs)
+
+# Object columns at or below this share of distinct values become categoricals
+CATEGORY_MAX_UNIQUE_RATIO = 0.05
+
+def _compact_string_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert object string columns to compact dtypes in place.
+
+    Repetitive columns (states, plate types, statuses...) become ``category``:
+    the generators compare, count and group them over the whole frame, and
+    integer codes make that cheaper than hashing a Python string per cell.
+    With pyarrow installed the remaining free-text columns become
+    ``string[pyarrow]``, whose contiguous buffers are smaller and scanned by
+    Arrow kernels. Date-like columns are left alone for ``pd.to_datetime``.
+    """
+    limit = max(1, int(len(df) * CATEGORY_MAX_UNIQUE_RATIO))
+    for col in df.select_dtypes(include=['object']).columns:
+        if _compile(r'date|time').search(str(col)):
+            continue
+        if df[col].nunique(dropna=True) <= limit:
+            df[col] = df[col].astype('category')
+        elif PYARROW_AVAILABLE:
+            df[col] = df[col].astype('string[pyarrow]')
+    return df
+
+def load_brazilian_ecommerce():
+    """Load the Brazilian E-commerce sheets (100+ MB, multi-file), or None when missing."""
     try:
 
-        orders = pd.read_csv(exe_dir/'real_datasets/olist_orders_dataset.csv')
-        order_items = pd.read_csv(exe_dir/'real_datasets/olist_order_items_dataset.csv')
-        products = pd.read_csv(exe_dir/'real_datasets/olist_products_dataset.csv')
-        customers = pd.read_csv(exe_dir/'real_datasets/olist_customers_dataset.csv')
-        datasets['brazilian_ecommerce'] = {
+        # All columns are kept: build_context shows every column of a sheet
+        orders = _read_full_csv(
+            exe_dir/'real_datasets/olist_orders_dataset.csv',
+            dtype={'order_status': 'category'}
+        )
+        order_items = _read_full_csv(
+            exe_dir/'real_datasets/olist_order_items_dataset.csv',
+            dtype={'order_item_id': 'int32', 'price': 'float64', 'freight_value': 'float64'}
+        )
+        products = _read_full_csv(exe_dir/'real_datasets/olist_products_dataset.csv')
+        customers = _read_full_csv(exe_dir/'real_datasets/olist_customers_dataset.csv')
+        print(f"Loaded Brazilian E-commerce: {len(orders)} orders")
+        return {
             'orders': orders,
             'order_items': order_items,
             'products': products,
             'customers': customers
         }
-        print(f"Loaded Brazilian E-commerce: {len(orders)} orders")
     except Exception as e:
         print(f"Brazilian E-commerce not found: {e}")
-    
-    # NYC Parking Tickets (multiple yearly files)
+        return None
+
+def load_nyc_parking():
+    """Load a sample of the NYC Parking Tickets yearly files, or None when missing."""
     try:
         base = Path(exe_dir/'real_datasets')
-        patterns = [
-            'Parking_Violations_Issued*.csv'  ]
-        files = []
-        for pat in patterns:
-            files.extend(sorted(base.glob(pat)))
-        # Deduplicate preserving order
-        seen = set()
-        files = [f for f in files if not (f in seen or seen.add(f))]
+        files = sorted(base.glob('Parking_Violations_Issued*.csv'))
         # Fallback to single default file if present
         default_csv = base / 'Parking_Violations_Issued.csv'
         if not files and default_csv.exists():
@@ -69,7 +131,7 @@ def load_large_datasets():
                     break
                 nrows = min(per_file, target_total - total_loaded)
                 try:
-                    df_part = pd.read_csv(fpath, nrows=nrows)
+                    df_part = _read_csv_head(fpath, nrows)
                     # Add a simple year/tag from filename if available
                     m = re.search(r'(20\d{2})', fpath.name)
                     if m and 'SourceYear' not in df_part.columns:
@@ -79,129 +141,239 @@ def load_large_datasets():
                 except Exception as e_inner:
                     print(f"  Skipped {fpath.name}: {e_inner}")
             if samples:
-                parking = pd.concat(samples, ignore_index=True, sort=False)
-                datasets['nyc_parking'] = parking
+                parking = _compact_string_columns(pd.concat(samples, ignore_index=True, sort=False))
                 print(f"Loaded NYC Parking: {len(parking)} rows from {len(samples)} file(s)")
+                return parking
         else:
             print("NYC Parking files not found.")
     except Exception as e:
         print(f"NYC Parking not found: {e}")
-    
-    
+    return None
 
-    
-    # COVID-19 (100+ MB)
+def load_covid():
+    """Load the COVID-19 dataset (100+ MB), or None when missing."""
     try:
         covid_files = list(Path(exe_dir/'real_datasets').glob('*covid*.csv'))
         if covid_files:
-            covid = pd.read_csv(covid_files[0], nrows=50000)
-            datasets['covid'] = covid
+            covid = _compact_string_columns(pd.read_csv(covid_files[0], nrows=50000))
             print(f"Loaded COVID-19: {len(covid)} records")
+            return covid
     except Exception as e:
         print(f"COVID-19 not found: {e}")
-    
+    return None
+
+# (dataset key, loader) for each large dataset
+DATASET_LOADERS: Tuple[Tuple[str, Callable], ...] = (
+    ('brazilian_ecommerce', load_brazilian_ecommerce),
+    ('nyc_parking', load_nyc_parking),
+    ('covid', load_covid),
+)
+
+def load_large_datasets():
+    """Load large datasets with proper handling"""
+    datasets = {}
+    for key, loader in DATASET_LOADERS:
+        data = loader()
+        if data is not None:
+            datasets[key] = data
     return datasets
 
+def _read_csv_head(path, nrows: int) -> pd.DataFrame:
+    """Read the first ``nrows`` rows of a CSV.
+
+    With PyArrow, record batches are streamed and reading stops once enough
+    rows are buffered; any streaming failure (e.g. a type change after the
+    first block) falls back to pandas' C engine.
+    """
+    if PYARROW_AVAILABLE:
+        try:
+            import pyarrow as pa
+            import pyarrow.csv as pa_csv
+
+            batches = []
+            total = 0
+            with pa_csv.open_csv(path) as reader:
+                for batch in reader:
+                    batches.append(batch)
+                    total += batch.num_rows
+                    if total >= nrows:
+                        break
+            if batches:
+                return pa.Table.from_batches(batches).slice(0, nrows).to_pandas()
+        except Exception:
+            pass
+    return pd.read_csv(path, nrows=nrows)
+
 # ============================================
 # 3. CONTEXT BUILDER (Same as before)
 # ============================================
 
 def build_context(sheets: Dict[str, pd.DataFrame], focus_sheet: str = None, rows_limit: int = 50):
     """Build standardized workbook context"""
-    summary = f"WORKBOOK: {len(sheets)} sheets\n"
-    summary += "SUMMARY: " + "; ".join([f"{name} (rows={len(df)}, cols={len(df.columns)})" for name, df in sheets.items()]) + "\n\n"
+    # Collected in a list and joined once; repeated += on a growing str is quadratic
+    parts: List[str] = [
+        f"WORKBOOK: {len(sheets)} sheets\n",
+        "SUMMARY: " + "; ".join([f"{name} (rows={len(df)}, cols={len(df.columns)})" for name, df in sheets.items()]) + "\n\n",
+    ]
     
     for sheet_name, df in sheets.items():
         if focus_sheet and sheet_name.lower() != focus_sheet.lower():
             continue
         
-        summary += f"SHEET: {sheet_name}\n"
-        summary += f"COLUMNS: {', '.join(df.columns)}\n"
+        parts.append(f"SHEET: {sheet_name}\n")
+        parts.append(f"COLUMNS: {', '.join(df.columns)}\n")
         
         sample = df.head(min(rows_limit, len(df)))
-        summary += f"ROWS (showing {len(sample)} of {len(df)}):\n"
-        for _, row in sample.iterrows():
-            summary += " | ".join([str(v) for v in row.values]) + "\n"
-        summary += "\n"
+        parts.append(f"ROWS (showing {len(sample)} of {len(df)}):\n")
+        # Object ndarray rows keep each column's own type (iterrows boxed every
+        # row into a Series, upcasting ints to floats in all-numeric frames)
+        parts.extend(" | ".join(map(str, row)) + "\n" for row in sample.to_numpy(dtype=object))
+        parts.append("\n")
     
-    return summary.strip()
+    return "".join(parts).strip()
 
-def _to_json_safe(obj: Any) -> Any:
-    """Recursively convert pandas/numpy/datetime objects and non-JSON-safe keys to JSON-safe types."""
+def _json_safe_key(k: Any) -> Any:
+    """Map a dict key to a JSON-compatible key."""
+    if isinstance(k, (str, int, float, bool)) or k is None:
+        return k
+    if isinstance(k, (pd.Timestamp, datetime)):
+        try:
+            return k.isoformat()
+        except Exception:
+            return str(k)
+    if isinstance(k, np.generic):
+        native = k.item()
+        return native if isinstance(native, (str, int, float, bool)) or native is None else str(native)
+    return str(k)
+
+
+def _iso_or_str(obj: Any) -> str:
     try:
-        import pandas as _pd
-        import numpy as _np
+        return obj.isoformat()
     except Exception:
-        _pd = None
-        _np = None
+        return str(obj)
+
+
+def _datetime64_to_json(obj: Any) -> str:
+    try:
+        return pd.Timestamp(obj).isoformat()
+    except Exception:
+        return str(obj)
+
+
+def _float_to_json(obj: Any) -> Any:
+    try:
+        return None if np.isnan(obj) else float(obj)
+    except Exception:
+        return float(obj)
+
+
+def _identity(obj: Any) -> Any:
+    return obj
+
+
+# Exact-type dispatch for the types _to_json_safe meets on almost every call;
+# subclasses and anything unlisted fall back to the isinstance chain
+_JSON_SAFE_DISPATCH: Dict[type, Callable[[Any], Any]] = {
+    str: _identity,
+    int: _identity,
+    bool: _identity,
+    type(None): _identity,
+    float: lambda o: None if o != o else o,
+    dict: lambda o: {_json_safe_key(k): _to_json_safe(v) for k, v in o.items()},
+    list: lambda o: [_to_json_safe(x) for x in o],
+    tuple: lambda o: [_to_json_safe(x) for x in o],
+    np.ndarray: lambda o: _to_json_safe(o.tolist()),
+    pd.Series: lambda o: _to_json_safe(o.tolist()),
+    pd.Index: lambda o: _to_json_safe(o.tolist()),
+    pd.Timestamp: _iso_or_str,
+    datetime: _iso_or_str,
+    date: _iso_or_str,
+    np.datetime64: _datetime64_to_json,
+    pd.Timedelta: str,
+    np.timedelta64: str,
+    np.bool_: bool,
+    **{t: int for t in (np.int8, np.int16, np.int32, np.int64,
+                        np.uint8, np.uint16, np.uint32, np.uint64)},
+    **{t: _float_to_json for t in (np.float16, np.float32, np.float64)},
+}
+
+
+def _to_json_safe(obj: Any) -> Any:
+    """Recursively convert pandas/numpy/datetime objects and non-JSON-safe keys to JSON-safe types."""
+    fn = _JSON_SAFE_DISPATCH.get(type(obj))
+    if fn is not None:
+        return fn(obj)
 
     if isinstance(obj, dict):
-        safe = {}
-        for k, v in obj.items():
-            if isinstance(k, (str, int, float, bool)) or k is None:
-                key = k
-            else:
-                if (_pd is not None and isinstance(k, (_pd.Timestamp,))) or isinstance(k, (datetime,)):
-                    try:
-                        key = (k if isinstance(k, datetime) else _pd.Timestamp(k)).isoformat()
-                    except Exception:
-                        key = str(k)
-                elif _np is not None and isinstance(k, (_np.generic,)):
-                    native = k.item()
-                    key = native if isinstance(native, (str, int, float, bool)) or native is None else str(native)
-                else:
-                    key = str(k)
-            safe[key] = _to_json_safe(v)
-        return safe
-
-    if isinstance(obj, list):
-        return [_to_json_safe(x) for x in obj]
-    if isinstance(obj, tuple):
+        return _JSON_SAFE_DISPATCH[dict](obj)
+    if isinstance(obj, (list, tuple)):
         return [_to_json_safe(x) for x in obj]
-
-    if _pd is not None and isinstance(obj, (_pd.Series, _pd.Index)):
-        return _to_json_safe(obj.tolist())
-    if _np is not None and isinstance(obj, _np.ndarray):
+    if isinstance(obj, (pd.Series, pd.Index, np.ndarray)):
         return _to_json_safe(obj.tolist())
+    if isinstance(obj, (pd.Timestamp, datetime, date)):
+        return _iso_or_str(obj)
+    if isinstance(obj, np.datetime64):
+        return _datetime64_to_json(obj)
+    if isinstance(obj, (pd.Timedelta, np.timedelta64)):
+        return str(obj)
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return _float_to_json(obj)
 
-    if (_pd is not None and isinstance(obj, (_pd.Timestamp,))) or isinstance(obj, (datetime, date)):
-        try:
-            return obj.isoformat() if isinstance(obj, (datetime, date)) else _pd.Timestamp(obj).isoformat()
-        except Exception:
-            return str(obj)
-    if _np is not None and isinstance(obj, _np.datetime64):
-        try:
-            return _pd.Timestamp(obj).isoformat() if _pd is not None else str(obj)
-        except Exception:
-            return str(obj)
+    try:
+        if pd.isna(obj):
+            return None
+    except Exception:
+        pass
 
-    if _pd is not None and isinstance(obj, _pd.Timedelta):
-        return str(obj)
-    if _np is not None and isinstance(obj, _np.timedelta64):
+    return obj
+
+
+def _orjson_default(obj: Any) -> Any:
+    """Encode the few values orjson has no native form for (called by orjson only)."""
+    if obj is pd.NA:
+        return None
+    if isinstance(obj, (pd.Timestamp, datetime, date)):
+        return _iso_or_str(obj)
+    if isinstance(obj, (pd.Timedelta, np.timedelta64)):
         return str(obj)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return obj.tolist()
+    raise TypeError
 
-    if _np is not None and isinstance(obj, _np.bool_):
-        return bool(obj)
-    if _np is not None and isinstance(obj, (_np.integer,)):
-        return int(obj)
-    if _np is not None and isinstance(obj, (_np.floating,)):
-        try:
-            return None if _np.isnan(obj) else float(obj)
-        except Exception:
-            return float(obj)
 
-    if _pd is not None:
+def _dumps_answer(answer: Any) -> str:
+    """Pretty-print an answer; orjson encodes numpy/datetime values natively, skipping the _to_json_safe walk."""
+    if orjson is not None:
         try:
-            if _pd.isna(obj):
-                return None
-        except Exception:
+            return orjson.dumps(
+                answer,
+                default=_orjson_default,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+            ).decode("utf-8")
+        except TypeError:
+            # e.g. a numpy scalar dict key; take the general path
             pass
-
-    return obj
+    return _dumps_indented(_to_json_safe(answer))
 
 
 def safe_mean(x):
     """Return mean of numeric values, 0.0 if empty/all-NaN. Accepts Series, arrays, lists, or scalars."""
+    # Fast path: numeric numpy-backed arrays/Series need no coercion, so skip
+    # building a Series and average directly in numpy
+    dtype = getattr(x, 'dtype', None)
+    if isinstance(x, (np.ndarray, pd.Series)) and isinstance(dtype, np.dtype) and dtype.kind in 'biuf':
+        arr = np.asarray(x, dtype=float)
+        arr = arr[~np.isnan(arr)]
+        return float(arr.mean()) if arr.size else 0.0
+
+    # Mixed or messy inputs: coerce through pandas
     try:
         s = x if isinstance(x, pd.Series) else pd.Series(x)
     except Exception:
@@ -213,6 +385,9 @@ def safe_mean(x):
     return float(s.mean()) if len(s) else 0.0
 
 
+# Separates the sheet context from the question in the user message
+QUESTION_MARKER = "\n\nQuestion: "
+
 def build_training_example(context: str, question: str, answer: Dict[str, Any]):
     """Create a single training example"""
     return {
@@ -223,18 +398,36 @@ def build_training_example(context: str, question: str, answer: Dict[str, Any]):
             },
             {
                 "role": "user",
-                "content": context + f"\n\nQuestion: {question}"
+                "content": f"{context}{QUESTION_MARKER}{question}"
             },
             {
                 "role": "assistant",
-                "content": json.dumps(_to_json_safe(answer), indent=2, ensure_ascii=False)
+                "content": _dumps_answer(answer)
             }
         ]
     }
 
+# Context strings per (id(df), sheet_name). Generators call create_example
+# thousands of times on the same few frames, and the context depends only on
+# the frame's first rows; the frame itself is kept in the entry so a recycled
+# id() can never match a different frame.
+_CONTEXT_CACHE: Dict[Tuple[int, str], Tuple[pd.DataFrame, str]] = {}
+
+
+def clear_context_cache() -> None:
+    """Drop cached contexts (call between runs or after mutating a frame)."""
+    _CONTEXT_CACHE.clear()
+
+
 def create_example(df, sheet_name, question, answer):
     """Helper to create training example"""
-    context = build_context({sheet_name: df}, focus_sheet=sheet_name)
+    key = (id(df), sheet_name)
+    cached = _CONTEXT_CACHE.get(key)
+    if cached is not None and cached[0] is df:
+        context = cached[1]
+    else:
+        context = build_context({sheet_name: df}, focus_sheet=sheet_name)
+        _CONTEXT_CACHE[key] = (df, context)
     return build_training_example(context, f"On sheet '{sheet_name}' {question}", answer)
 
 # ============================================
@@ -243,119 +436,130 @@ def create_example(df, sheet_name, question, answer):
 
 def generate_ecommerce_tasks(ecom_sheets: Dict[str, pd.DataFrame], n_samples: int = 5000):
     """E-commerce specific analytical questions"""
-    examples = []
     per_task = n_samples // 20
     
     if 'orders' in ecom_sheets and 'order_items' in ecom_sheets:
         orders = ecom_sheets['orders']
         items = ecom_sheets['order_items']
         
+        # Every answer below depends only on the frames, so each aggregate is
+        # computed once and reused for all of its per_task examples
+        
         # Revenue analysis
+        merged = orders.merge(items, on='order_id')
+        total_revenue = round((merged['price'] + merged['freight_value']).sum(), 2)
+        del merged
         for _ in range(per_task):
-            merged = orders.merge(items, on='order_id')
-            merged['revenue'] = merged['price'] + merged['freight_value']
-            total_revenue = round(merged['revenue'].sum(), 2)
-            
-            examples.append(create_example(
+            yield create_example(
                 orders, 'Orders',
                 "What is the total revenue (price + freight) from all orders?",
                 {"operation": "revenue_sum", "result": total_revenue, "insufficient": False}
-            ))
+            )
         
         # Average order value
+        avg_order = round(safe_mean(items.groupby('order_id', sort=False, observed=True)['price'].sum()), 2)
         for _ in range(per_task):
-            avg_order = round(safe_mean(items.groupby('order_id')['price'].sum()), 2)
-            examples.append(create_example(
+            yield create_example(
                 items, 'OrderItems',
                 "What is the average order value?",
                 {"operation": "avg", "result": avg_order, "insufficient": False}
-            ))
+            )
         
         # Orders by status
-        for _ in range(per_task):
-            status = random.choice(orders['order_status'].unique())
-            count = len(orders[orders['order_status'] == status])
-            examples.append(create_example(
+        status_counts = orders['order_status'].value_counts().to_dict()
+        statuses = list(status_counts)
+        for _ in range(per_task if statuses else 0):
+            status = random.choice(statuses)
+            count = status_counts[status]
+            yield create_example(
                 orders, 'Orders',
                 f"How many orders have status '{status}'?",
                 {"count": count, "criteria": {"order_status": status}, "insufficient": False}
-            ))
+            )
         
         # Top selling products
+        top_products = items.groupby('product_id', sort=False, observed=True)['price'].sum().nlargest(5).to_dict()
         for _ in range(per_task):
-            top_products = items.groupby('product_id')['price'].sum().nlargest(5).to_dict()
-            examples.append(create_example(
+            yield create_example(
                 items, 'OrderItems',
                 "What are the top 5 products by total sales?",
                 {"operation": "top_n", "n": 5, "result": top_products, "insufficient": False}
-            ))
-    
-    return examples
+            )
 
 def generate_bank_marketing_tasks(bank: pd.DataFrame, n_samples: int = 5000):
     """Bank marketing campaign analysis"""
-    examples = []
     per_task = n_samples // 20
     
+    # Per-category totals are counted once; each example is then a dict lookup
+    converted_rows = bank[bank['y'] == 'yes']
+    job_totals = bank['job'].value_counts().to_dict()
+    job_converted = converted_rows['job'].value_counts().to_dict()
+    education_converted = converted_rows['education'].value_counts().to_dict()
+    del converted_rows
+    jobs = bank['job'].unique().tolist()
+    educations = bank['education'].unique().tolist()
+    
     # Conversion rate by job
     for _ in range(per_task):
-        job = random.choice(bank['job'].unique())
-        total = len(bank[bank['job'] == job])
-        converted = len(bank[(bank['job'] == job) & (bank['y'] == 'yes')])
+        job = random.choice(jobs)
+        total = job_totals.get(job, 0)
+        converted = job_converted.get(job, 0)
         rate = round((converted / total * 100), 2) if total > 0 else 0
-        examples.append(create_example(
+        yield create_example(
             bank, 'Campaigns',
             f"What is the conversion rate for job category '{job}'?",
             {"operation": "conversion_rate", "filters": {"job": job}, "result": rate, "insufficient": False}
-        ))
+        )
     
     # Average campaign contacts
+    avg_contacts = round(safe_mean(bank['campaign']), 2)
     for _ in range(per_task):
-        avg_contacts = round(safe_mean(bank['campaign']), 2)
-        examples.append(create_example(
+        yield create_example(
             bank, 'Campaigns',
             "What is the average number of contacts per campaign?",
             {"operation": "avg", "column": "campaign", "result": avg_contacts, "insufficient": False}
-        ))
+        )
     
     # Success by education
     for _ in range(per_task):
-        education = random.choice(bank['education'].unique())
-        success_count = len(bank[(bank['education'] == education) & (bank['y'] == 'yes')])
-        examples.append(create_example(
+        education = random.choice(educations)
+        success_count = education_converted.get(education, 0)
+        yield create_example(
             bank, 'Campaigns',
             f"How many successful conversions for education level '{education}'?",
             {"count": success_count, "criteria": {"education": education, "success": "yes"}, "insufficient": False}
-        ))
-    
-    return examples
+        )
 
-def _find_first(df: pd.DataFrame, patterns: List[str]) -> str:
-    cols = [c for c in df.columns]
+@lru_cache(maxsize=None)
+def _compile(pattern: str) -> "re.Pattern[str]":
+    return re.compile(pattern, re.IGNORECASE)
+
+def _find_first(columns: Iterable[Any], patterns: List[str]) -> str:
+    cols = [(c, c if isinstance(c, str) else str(c)) for c in columns]
     for p in patterns:
-        for c in cols:
-            if re.search(p, str(c), flags=re.IGNORECASE):
+        search = _compile(p).search
+        for c, name in cols:
+            if search(name):
                 return c
     return None
 
 def generate_parking_tasks(parking: pd.DataFrame, n_samples: int = 10000):
     """NYC parking violations tasks across multiple yearly files using inferred metadata."""
-    examples = []
     per_task = max(1, n_samples // 20)
 
     # Infer columns
-    date_col = _find_first(parking, [r'^issue\s*date$', r'date'])
-    desc_col = _find_first(parking, [r'violation\s*description', r'violation\s*code'])
-    state_col = _find_first(parking, [r'registration\s*state', r'state$'])
-    plate_type_col = _find_first(parking, [r'plate\s*type'])
-    borough_col = _find_first(parking, [r'borough', r'county'])
-    year_col = 'SourceYear' if 'SourceYear' in parking.columns else _find_first(parking, [r'year'])
+    date_col = _find_first(parking.columns, [r'^issue\s*date$', r'date'])
+    desc_col = _find_first(parking.columns, [r'violation\s*description', r'violation\s*code'])
+    state_col = _find_first(parking.columns, [r'registration\s*state', r'state$'])
+    plate_type_col = _find_first(parking.columns, [r'plate\s*type'])
+    borough_col = _find_first(parking.columns, [r'borough', r'county'])
+    year_col = 'SourceYear' if 'SourceYear' in parking.columns else _find_first(parking.columns, [r'year'])
 
     # Numeric amount column preference
     numeric_cols = parking.select_dtypes(include=[np.number]).columns.tolist()
     amount_col = None
     for pref in [r'fine', r'penalty', r'payment', r'amount', r'total']:
-        amount_col = _find_first(parking[numeric_cols] if numeric_cols else parking, [pref])
+        amount_col = _find_first(numeric_cols or parking.columns, [pref])
         if amount_col:
             break
     if not amount_col and numeric_cols:
@@ -363,41 +567,46 @@ def generate_parking_tasks(parking: pd.DataFrame, n_samples: int = 10000):
 
     # 1) Counts by description
     if desc_col is not None and desc_col in parking.columns:
-        vals = parking[desc_col].dropna().astype(str).unique().tolist()
+        desc_str = parking[desc_col].astype(str)
+        desc_counts = desc_str.value_counts()
+        vals = desc_str[parking[desc_col].notna()].unique().tolist()
+        del desc_str
+        # Plain dict so the sample loop makes no pandas calls
+        count_by_desc = {v: int(c) for v, c in desc_counts.items()}
         if vals:
             for _ in range(per_task):
                 v = random.choice(vals)
-                cnt = int((parking[desc_col].astype(str) == str(v)).sum())
-                examples.append(create_example(
+                cnt = count_by_desc.get(v, 0)
+                yield create_example(
                     parking, 'ParkingViolations',
                     f"How many violations are for description '{v}'?",
                     {"count": cnt, "criteria": {desc_col: v}, "insufficient": False}
-                ))
+                )
 
     # 2) Top 5 violation descriptions
     if desc_col is not None and desc_col in parking.columns:
-        top5 = parking[desc_col].astype(str).value_counts().head(5).to_dict()
-        examples.append(create_example(
+        top5 = desc_counts.head(5).to_dict()
+        yield create_example(
             parking, 'ParkingViolations',
             "What are the top 5 violation descriptions by count?",
             {"operation": "top_n", "n": 5, "group_by": desc_col, "result": top5, "insufficient": False}
-        ))
+        )
 
     # 3) Average fine/amount overall and by year
     if amount_col is not None and amount_col in parking.columns:
         overall_avg = round(safe_mean(parking[amount_col]), 2)
-        examples.append(create_example(
+        yield create_example(
             parking, 'ParkingViolations',
             f"What is the average {amount_col} across all violations?",
             {"operation": "avg", "column": amount_col, "result": overall_avg, "insufficient": False}
-        ))
+        )
         if year_col and year_col in parking.columns:
-            by_year = parking.groupby(year_col)[amount_col].mean().round(2).dropna().to_dict()
-            examples.append(create_example(
+            by_year = parking.groupby(year_col, observed=True)[amount_col].mean().round(2).dropna().to_dict()
+            yield create_example(
                 parking, 'ParkingViolations',
                 f"What is the average {amount_col} by {year_col}?",
                 {"operation": "avg", "group_by": year_col, "column": amount_col, "result": by_year, "insufficient": False}
-            ))
+            )
 
     # 4) Counts by state/borough/plate type
     for col, label in [(state_col, 'registration state'), (borough_col, 'borough'), (plate_type_col, 'plate type')]:
@@ -406,103 +615,215 @@ def generate_parking_tasks(parking: pd.DataFrame, n_samples: int = 10000):
             if vals:
                 v = random.choice(vals)
                 cnt = int((parking[col].astype(str) == str(v)).sum())
-                examples.append(create_example(
+                yield create_example(
                     parking, 'ParkingViolations',
                     f"How many violations have {label} '{v}'?",
                     {"count": cnt, "criteria": {col: v}, "insufficient": False}
-                ))
+                )
 
     # 5) Peak month by counts
     if date_col and date_col in parking.columns:
         dt = pd.to_datetime(parking[date_col], errors='coerce')
-        months = dt.dt.to_period('M').astype(str)
-        peak_month = months.value_counts().idxmax() if months.notna().any() else None
-        if peak_month:
-            cnt = int((months == peak_month).sum())
-            examples.append(create_example(
+        valid = dt.notna().to_numpy()
+        if valid.any():
+            # One bincount over integer month codes (year * 12 + month - 1)
+            # instead of building a "YYYY-MM" string per row
+            codes = (dt.dt.year.to_numpy()[valid] * 12 + dt.dt.month.to_numpy()[valid] - 1).astype(np.int64)
+            first = int(codes.min())
+            counts = np.bincount(codes - first)
+            peak = int(counts.argmax())
+            cnt = int(counts[peak])
+            peak_code = first + peak
+            peak_month = f"{peak_code // 12:04d}-{peak_code % 12 + 1:02d}"
+            yield create_example(
                 parking, 'ParkingViolations',
                 f"Which month has the highest number of violations?",
                 {"operation": "peak_month", "result": peak_month, "count": cnt, "insufficient": False}
-            ))
+            )
 
-    return examples
+def _group_sum(keys: pd.Series, values: np.ndarray) -> pd.Series:
+    """Sum ``values`` per distinct key (missing keys dropped) in one factorize + bincount pass."""
+    codes, uniques = pd.factorize(keys)
+    valid = codes >= 0
+    sums = np.bincount(codes[valid], weights=np.asarray(values, dtype=float)[valid], minlength=len(uniques))
+    return pd.Series(sums, index=uniques)
 
 def generate_covid_tasks(covid: pd.DataFrame, n_samples: int = 10000):
     """COVID-19 dataset tasks using inferred metadata (date, region, metrics)."""
-    examples = []
     per_task = max(1, n_samples // 20)
 
     # Infer columns
-    date_col = _find_first(covid, [r'^date$', r'date'])
-    region_col = _find_first(covid, [r'country', r'state', r'province', r'county', r'region'])
+    date_col = _find_first(covid.columns, [r'^date$', r'date'])
+    region_col = _find_first(covid.columns, [r'country', r'state', r'province', r'county', r'region'])
     # Prefer case-like columns
     metric_prefs = [r'new[_\s]?cases', r'cases', r'confirmed', r'deaths', r'hospital']
     numeric_cols = covid.select_dtypes(include=[np.number]).columns.tolist()
     metric_col = None
     for p in metric_prefs:
-        mc = _find_first(covid[numeric_cols] if numeric_cols else covid, [p])
+        mc = _find_first(numeric_cols or covid.columns, [p])
         if mc:
             metric_col = mc
             break
     if not metric_col and numeric_cols:
         metric_col = numeric_cols[0]
 
+    # Column conversions are materialised once and shared by every task below
+    has_metric = bool(metric_col) and metric_col in covid.columns
+    has_region = bool(region_col) and region_col in covid.columns
+    metric_num = pd.to_numeric(covid[metric_col], errors='coerce').fillna(0) if has_metric else None
+
     # 1) Total metric sum
-    if metric_col and metric_col in covid.columns:
-        total_val = float(pd.to_numeric(covid[metric_col], errors='coerce').fillna(0).sum())
-        examples.append(create_example(
+    if has_metric:
+        total_val = float(metric_num.sum())
+        yield create_example(
             covid, 'COVID',
             f"What is the total {metric_col} across the dataset?",
             {"operation": "sum", "column": metric_col, "result": round(total_val, 2), "insufficient": False}
-        ))
+        )
 
     # 2) Peak day for metric
-    if metric_col and date_col and (metric_col in covid.columns) and (date_col in covid.columns):
+    if has_metric and date_col and date_col in covid.columns:
         dt = pd.to_datetime(covid[date_col], errors='coerce')
-        df = covid.copy()
-        df['_dt'] = dt
-        daily = df.groupby('_dt')[metric_col].sum().dropna()
+        daily = _group_sum(dt, metric_num.to_numpy())
         if not daily.empty:
             peak_day = daily.idxmax()
             peak_val = float(daily.max())
-            examples.append(create_example(
+            yield create_example(
                 covid, 'COVID',
                 f"Which date has the highest total {metric_col}?",
                 {"operation": "peak_day", "column": metric_col, "result": str(peak_day.date()) if hasattr(peak_day, 'date') else str(peak_day), "value": round(peak_val, 2), "insufficient": False}
-            ))
+            )
 
     # 3) Average metric
-    if metric_col and metric_col in covid.columns:
+    if has_metric:
         avg_val = round(safe_mean(covid[metric_col]), 2)
-        examples.append(create_example(
+        yield create_example(
             covid, 'COVID',
             f"What is the average of {metric_col}?",
             {"operation": "avg", "column": metric_col, "result": avg_val, "insufficient": False}
-        ))
+        )
 
     # 4) Region-specific totals
-    if region_col and region_col in covid.columns and metric_col and metric_col in covid.columns:
-        vals = covid[region_col].dropna().astype(str).unique().tolist()
+    if has_region and has_metric:
+        region_str = covid[region_col].astype(str)
+        # Plain dict so the sample loop makes no pandas calls
+        total_by_region = {v: float(t) for v, t in _group_sum(region_str, metric_num.to_numpy()).items()}
+        vals = region_str[covid[region_col].notna()].unique().tolist()
+        del region_str
         if vals:
             for _ in range(per_task):
                 v = random.choice(vals)
-                total = float(pd.to_numeric(covid.loc[covid[region_col].astype(str) == v, metric_col], errors='coerce').fillna(0).sum())
-                examples.append(create_example(
+                total = total_by_region.get(v, 0.0)
+                yield create_example(
                     covid, 'COVID',
                     f"What is the total {metric_col} for {region_col} '{v}'?",
                     {"operation": "sum", "column": metric_col, "filters": {region_col: v}, "result": round(total, 2), "insufficient": False}
-                ))
+                )
 
     # 5) Top 5 regions by total metric
-    if region_col and region_col in covid.columns and metric_col and metric_col in covid.columns:
-        grouped = covid.groupby(region_col)[metric_col].sum().sort_values(ascending=False).head(5)
-        examples.append(create_example(
+    if has_region and has_metric:
+        grouped = _group_sum(covid[region_col], metric_num.to_numpy()).nlargest(5)
+        yield create_example(
             covid, 'COVID',
             f"What are the top 5 {region_col}s by total {metric_col}?",
             {"operation": "top_n", "n": 5, "group_by": region_col, "column": metric_col, "result": grouped.round(2).to_dict(), "insufficient": False}
-        ))
+        )
 
-    return examples
+# Examples carry multi-KB contexts, so write through a large buffer
+JSONL_WRITE_BUFFER_SIZE = 1 << 20
+
+def write_examples(path: Path, examples: Iterable[Any]) -> List[Tuple[int, int]]:
+    """Stream examples to a JSONL file; accepts dicts or pre-encoded lines. Returns each line's (offset, length)."""
+    spans = []
+    offset = 0
+    with open(path, "wb", buffering=JSONL_WRITE_BUFFER_SIZE) as f:
+        for ex in examples:
+            line = ex if isinstance(ex, bytes) else _encode_line(ex)
+            f.write(line)
+            spans.append((offset, len(line)))
+            offset += len(line)
+    return spans
+
+def iter_shuffled_lines(parts: List[Tuple[Path, List[Tuple[int, int]]]]) -> Iterable[bytes]:
+    """Yield every line of the part files in random order; only the offsets are held in memory."""
+    order = [(i, offset, length) for i, (_, spans) in enumerate(parts) for offset, length in spans]
+    random.shuffle(order)
+    sources = [open(path, "rb") for path, _ in parts]
+    try:
+        for i, offset, length in order:
+            src = sources[i]
+            src.seek(offset)
+            yield src.read(length)
+    finally:
+        for src in sources:
+            src.close()
+
+def write_examples_parquet(path: Path, examples: Iterable[Any]) -> int:
+    """Write examples as a zstd Parquet table with one string column per message role. Returns the count.
+
+    Dictionary encoding stores the repeated system prompt and sheet contexts once
+    per row group. Requires pyarrow.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    loads = orjson.loads if orjson is not None else json.loads
+    columns: Dict[str, List[Any]] = {}
+    count = 0
+    for ex in examples:
+        record = loads(ex) if isinstance(ex, bytes) else ex
+        if "messages" in record:
+            record = {m["role"]: m["content"] for m in record["messages"]}
+        for key, value in record.items():
+            columns.setdefault(key, []).append(value)
+        count += 1
+    pq.write_table(pa.table(columns), path, compression="zstd", use_dictionary=True)
+    return count
+
+# (label, loader, generator) for each training domain
+DOMAIN_TASKS: Tuple[Tuple[str, Callable, Callable], ...] = (
+    ("E-commerce", load_brazilian_ecommerce, generate_ecommerce_tasks),
+    ("COVID-19", load_covid, generate_covid_tasks),
+    ("NYC Parking", load_nyc_parking, generate_parking_tasks),
+)
+
+def _context_id(context: str) -> str:
+    """Stable id for a context string (identical across worker processes)."""
+    return hashlib.sha1(context.encode("utf-8")).hexdigest()[:16]
+
+def dedupe_context(example: Dict[str, Any], contexts: Dict[str, str]) -> Dict[str, Any]:
+    """Replace an example's inline context with a reference, recording the context in ``contexts`` (id -> text)."""
+    system, user, assistant = example["messages"]
+    context, _, question = user["content"].rpartition(QUESTION_MARKER)
+    context_id = _context_id(context)
+    contexts.setdefault(context_id, context)
+    return {
+        "context_id": context_id,
+        "system": system["content"],
+        "question": question,
+        "answer": assistant["content"],
+    }
+
+def _encode_domain(job: Tuple[Callable, Callable, int, bool, Path]) -> Tuple[Path, List[Tuple[int, int]], Dict[str, str]]:
+    """Load one domain's dataset and stream its examples to a JSONL part file (in a worker process).
+
+    The dataset is loaded here rather than in the parent, so its frames never
+    cross the process boundary and are freed when the job ends. Returns the
+    part path with each line's (offset, length); with ``dedupe`` set, lines
+    reference their context by id and the distinct contexts are returned too.
+    """
+    loader, generator, n_samples, dedupe, part_path = job
+    contexts: Dict[str, str] = {}
+    data = loader()
+    if data is None:
+        return part_path, [], contexts
+    try:
+        examples = generator(data, n_samples)
+        if dedupe:
+            examples = (dedupe_context(ex, contexts) for ex in examples)
+        return part_path, write_examples(part_path, examples), contexts
+    finally:
+        clear_context_cache()
 
 # ============================================
 # 5. MAIN EXECUTION
@@ -516,6 +837,10 @@ def main():
     parser.add_argument('--rows-limit', type=int, default=50, help='Rows per sheet to include in context.')
     parser.add_argument('--focus-sheet', type=str, default=None, help='Optional specific sheet name to focus on.')
     parser.add_argument('--train', action='store_true', help='Generate training JSONL from local datasets.')
+    parser.add_argument('--out-format', choices=['jsonl', 'parquet'], default='jsonl',
+                        help='Training output format (parquet requires pyarrow).')
+    parser.add_argument('--dedupe-contexts', action='store_true',
+                        help='Reference sheet contexts by id and write them once to a separate contexts JSONL.')
     args = parser.parse_args()
 
     if args.ask:
@@ -546,31 +871,50 @@ def main():
         return
 
     # Default: training mode (or --train)
-    print("\nLoading large datasets...")
-    datasets = load_large_datasets()
-    if not datasets:
-        print("No datasets loaded.")
+    if args.out_format == 'parquet' and not PYARROW_AVAILABLE:
+        print("--out-format parquet requires pyarrow.")
         return
 
     print("\nGenerating 50,000+ domain-specific training examples...")
-    all_examples = []
-    if 'brazilian_ecommerce' in datasets:
-        print("  E-commerce tasks (10,000 examples)...")
-        all_examples.extend(generate_ecommerce_tasks(datasets['brazilian_ecommerce'], 10000))
-    if 'covid' in datasets:
-        print("  COVID-19 tasks (10,000 examples)...")
-        all_examples.extend(generate_covid_tasks(datasets['covid'], 10000))
-    if 'nyc_parking' in datasets:
-        print("  NYC Parking tasks (10,000 examples)...")
-        all_examples.extend(generate_parking_tasks(datasets['nyc_parking'], 10000))
-
-    random.shuffle(all_examples)
+    clear_context_cache()
     output_path = Path(exe_dir / 'training_jsonl/large_datasets_50k_train.jsonl')
-    with open(output_path, "w", encoding="utf-8") as f:
-        for ex in all_examples:
-            f.write(json.dumps(ex, ensure_ascii=False) + "\n")
+    if args.out_format == 'parquet':
+        output_path = output_path.with_suffix('.parquet')
+    # Domains are independent, so each one is loaded, generated and streamed
+    # to a part file in its own process; the parent never holds a source
+    # frame or an example, and the parts are shuffled into the output by
+    # line offset.
+    contexts: Dict[str, str] = {}
+    with tempfile.TemporaryDirectory(dir=output_path.parent) as tmp_dir:
+        jobs = []
+        for i, (label, loader, generator) in enumerate(DOMAIN_TASKS):
+            print(f"  {label} tasks (10,000 examples)...")
+            jobs.append((loader, generator, 10000, args.dedupe_contexts, Path(tmp_dir) / f"part_{i}.jsonl"))
+
+        workers = min(len(jobs), os.cpu_count() or 1)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_encode_domain, jobs))
+        else:
+            results = [_encode_domain(job) for job in jobs]
+        parts = []
+        for part_path, spans, domain_contexts in results:
+            parts.append((part_path, spans))
+            contexts.update(domain_contexts)
+        if not any(spans for _, spans in parts):
+            print("No datasets loaded.")
+            return
+
+        if args.out_format == 'parquet':
+            count = write_examples_parquet(output_path, iter_shuffled_lines(parts))
+        else:
+            count = len(write_examples(output_path, iter_shuffled_lines(parts)))
+    if args.dedupe_contexts:
+        contexts_path = output_path.with_name(output_path.stem + '_contexts.jsonl')
+        write_examples(contexts_path, ({"context_id": cid, "context": text} for cid, text in contexts.items()))
+        print(f"Wrote {len(contexts)} shared contexts to: {contexts_path}")
 
-    print(f"\nGenerated {len(all_examples)} training examples!")
+    print(f"\nGenerated {count} training examples!")
     print(f"Saved to: {output_path}")
     print("\nDomain-specific coverage:")
     print("   - E-commerce: Revenue, AOV, product rankings")
@@ -5,10 +5,12 @@ import json
 import random
 from pathlib import Path
 from datetime import datetime, timedelta, date
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Iterable, Tuple
 import zipfile
 import io
+import tempfile
 import os, zipfile
+from concurrent.futures import ProcessPoolExecutor
 
 
 
@@ -19,6 +21,18 @@ import os, zipfile
 
 import sys
 
+# Optional: orjson's C encoder for the JSONL lines
+try:
+    import orjson
+
+    def _encode_line(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+except ImportError:
+    orjson = None
+
+    def _encode_line(obj: Any) -> bytes:
+        return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+
 # Base directory of this script
 exe_dir = Path(__file__).resolve().parent
 print(exe_dir)
@@ -226,29 +240,74 @@ def build_training_example(context: str, question: str, answer: Dict[str, Any]):
         ]
     }
 
+# Context strings per (id(df), sheet_name). generate_diverse_tasks calls
+# create_example thousands of times on the same frame, and the context depends
+# only on the frame's first rows; the frame itself is kept in the entry so a
+# recycled id() can never match a different frame.
+_CONTEXT_CACHE: Dict[Tuple[int, str], Tuple[pd.DataFrame, str]] = {}
+
+
+def clear_context_cache() -> None:
+    """Drop cached contexts (call between runs or after mutating a frame)."""
+    _CONTEXT_CACHE.clear()
+
+
 def create_example(df, sheet_name, question, answer):
     """Helper to create training example"""
-    context = build_context({sheet_name: df}, focus_sheet=sheet_name)
+    key = (id(df), sheet_name)
+    cached = _CONTEXT_CACHE.get(key)
+    if cached is not None and cached[0] is df:
+        context = cached[1]
+    else:
+        context = build_context({sheet_name: df}, focus_sheet=sheet_name)
+        _CONTEXT_CACHE[key] = (df, context)
     return build_training_example(context, f"On sheet '{sheet_name}' {question}", answer)
 
 # ============================================
 # 4. UNIVERSAL 100+ TASK TYPE GENERATOR
 # ============================================
 
-def generate_diverse_tasks(df: pd.DataFrame, sheet_name: str, n_samples: int = 10000):
+def _pick(seq, u: float):
+    """Element of ``seq`` selected by a uniform draw ``u`` in [0, 1)."""
+    return seq[int(u * len(seq))]
+
+def _pick_two(seq, u1: float, u2: float):
+    """Two distinct elements of ``seq`` selected by uniform draws in [0, 1)."""
+    i = int(u1 * len(seq))
+    j = int(u2 * (len(seq) - 1))
+    return seq[i], seq[j + (j >= i)]
+
+def generate_diverse_tasks(df: pd.DataFrame, sheet_name: str, n_samples: int = 10000, seed: Optional[int] = None):
     """
-    Generate 100+ diverse task types from any dataset
+    Generate 100+ diverse task types from any dataset (yielded one example at a time)
     """
-    examples = []
+    # Every sampling decision comes from this one generator, so a seed replays
+    # the same examples; each loop pre-draws its numbers in one batch and maps
+    # them to columns/values with _pick, instead of a random.choice per value
+    rng = np.random.default_rng(seed)
     
     # Get column info
     numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
     categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
     date_cols = [col for col in df.columns if 'date' in col.lower() or 'year' in col.lower()]
     
+    # Repetitive text columns become categoricals so the equality, value_counts
+    # and groupby passes below work on integer codes; date columns stay as
+    # text for the pd.to_datetime conversion in Category 6
+    for col in categorical_cols:
+        if col not in date_cols and df[col].dtype == object and df[col].nunique() < len(df) // 2:
+            df[col] = df[col].astype('category')
+    
     task_types = 100
     per_task = max(1, n_samples // task_types)
     
+    # Per-column values sampled from by the loops below, computed once per
+    # sheet instead of rescanning the column for every example
+    uniques = {col: df[col].dropna().unique() for col in categorical_cols}
+    nonnull = {col: df[col].dropna() for col in numeric_cols}
+    value_counts = {col: df[col].value_counts().to_dict() for col in categorical_cols}
+    n_rows = len(df)
+    
     print(f"    Generating {task_types} task types for {sheet_name}...")
     
     # ==========================================
@@ -257,56 +316,75 @@ def generate_diverse_tasks(df: pd.DataFrame, sheet_name: str, n_samples: int = 1
     
     # Type 1: Simple count
     if categorical_cols:
-        for _ in range(per_task):
-            col = random.choice(categorical_cols)
-            val = random.choice(df[col].dropna().unique())
-            count = len(df[df[col] == val])
-            examples.append(create_example(df, sheet_name, 
+        for u_col, u_val in rng.random((per_task, 2)).tolist():
+            col = _pick(categorical_cols, u_col)
+            val = _pick(uniques[col], u_val)
+            count = value_counts[col].get(val, 0)
+            yield create_example(df, sheet_name, 
                 f"How many records have {col} equal to '{val}'?",
-                {"count": count, "criteria": {col: val}, "insufficient": False}))
+                {"count": count, "criteria": {col: val}, "insufficient": False})
     
     # Type 2: Count with NOT
     if categorical_cols:
-        for _ in range(per_task):
-            col = random.choice(categorical_cols)
-            val = random.choice(df[col].dropna().unique())
-            count = len(df[df[col] != val])
-            examples.append(create_example(df, sheet_name,
+        for u_col, u_val in rng.random((per_task, 2)).tolist():
+            col = _pick(categorical_cols, u_col)
+            val = _pick(uniques[col], u_val)
+            # NaN rows compare not-equal too, so they count here
+            count = n_rows - value_counts[col].get(val, 0)
+            yield create_example(df, sheet_name,
                 f"How many records have {col} NOT equal to '{val}'?",
-                {"count": count, "criteria": {col: f"NOT {val}"}, "insufficient": False}))
+                {"count": count, "criteria": {col: f"NOT {val}"}, "insufficient": False})
     
     # Type 3: Count with IN
     if categorical_cols:
-        for _ in range(per_task):
-            col = random.choice(categorical_cols)
-            vals = random.sample(list(df[col].dropna().unique()), min(3, len(df[col].unique())))
-            count = len(df[df[col].isin(vals)])
-            examples.append(create_example(df, sheet_name,
+        for u_col in rng.random(per_task).tolist():
+            col = _pick(categorical_cols, u_col)
+            # Draw positions rather than values so the uniques are never copied
+            values = uniques[col]
+            vals = [values[i] for i in rng.choice(len(values), size=min(3, len(values)), replace=False).tolist()]
+            count = sum(value_counts[col].get(v, 0) for v in vals)
+            yield create_example(df, sheet_name,
                 f"How many records have {col} in {vals}?",
-                {"count": count, "criteria": {col: f"IN {vals}"}, "insufficient": False}))
+                {"count": count, "criteria": {col: f"IN {vals}"}, "insufficient": False})
     
     # Type 4: Text contains
     if categorical_cols:
-        for _ in range(per_task):
-            col = random.choice(categorical_cols)
-            val = str(random.choice(df[col].dropna().unique()))
+        # Match against each distinct (lower-cased) text once, weighted by how
+        # often it occurs, rather than scanning every row per substring
+        text_counts = {}
+        contains_counts = {}
+        for u_col, u_val in rng.random((per_task, 2)).tolist():
+            col = _pick(categorical_cols, u_col)
+            val = str(_pick(uniques[col], u_val))
             if len(val) > 3:
                 substring = val[:len(val)//2]
-                count = len(df[df[col].astype(str).str.contains(substring, na=False, case=False)])
-                examples.append(create_example(df, sheet_name,
+                key = (col, substring)
+                if key not in contains_counts:
+                    if col not in text_counts:
+                        text_counts[col] = [(str(text).lower(), int(n)) for text, n in df[col].astype(str).value_counts().items()]
+                    needle = substring.lower()
+                    contains_counts[key] = sum(n for text, n in text_counts[col] if needle in text)
+                count = contains_counts[key]
+                yield create_example(df, sheet_name,
                     f"How many records have {col} containing '{substring}'?",
-                    {"count": count, "criteria": {col: f"CONTAINS {substring}"}, "insufficient": False}))
+                    {"count": count, "criteria": {col: f"CONTAINS {substring}"}, "insufficient": False})
     
     # Type 5-10: Multi-criteria AND
     if len(categorical_cols) >= 2:
-        for _ in range(per_task * 6):
-            col1, col2 = random.sample(categorical_cols, 2)
-            val1 = random.choice(df[col1].dropna().unique())
-            val2 = random.choice(df[col2].dropna().unique())
-            count = len(df[(df[col1] == val1) & (df[col2] == val2)])
-            examples.append(create_example(df, sheet_name,
+        # Counts of every observed (value, value) combination per column pair,
+        # built on first use; a sparse groupby rather than a dense crosstab so
+        # high-cardinality pairs stay small
+        pair_counts = {}
+        for u_col1, u_col2, u_val1, u_val2 in rng.random((per_task * 6, 4)).tolist():
+            col1, col2 = _pick_two(categorical_cols, u_col1, u_col2)
+            val1 = _pick(uniques[col1], u_val1)
+            val2 = _pick(uniques[col2], u_val2)
+            if (col1, col2) not in pair_counts:
+                pair_counts[(col1, col2)] = df.groupby([col1, col2], observed=True, sort=False).size().to_dict()
+            count = pair_counts[(col1, col2)].get((val1, val2), 0)
+            yield create_example(df, sheet_name,
                 f"How many records have {col1}='{val1}' AND {col2}='{val2}'?",
-                {"count": count, "criteria": {col1: val1, col2: val2}, "insufficient": False}))
+                {"count": count, "criteria": {col1: val1, col2: val2}, "insufficient": False})
     
     # ==========================================
     # CATEGORY 2: AGGREGATIONS (30 types)
@@ -321,85 +399,112 @@ def generate_diverse_tasks(df: pd.DataFrame, sheet_name: str, n_samples: int = 1
             ('median', lambda x: x.median()),
             ('std', lambda x: x.std())
         ]
+        # All six statistics per (group column, value column), computed in one
+        # cythonized agg the first time the pair is drawn
+        group_stats = {}
+        # Interquartile bounds and row mask per filter column, and the result
+        # per (op, value column, filter column); both are fixed for the sheet
+        iqr_filters = {}
+        range_results = {}
         
         for op_name, op_func in operations:
             # Simple aggregation
-            for _ in range(per_task):
-                col = random.choice(numeric_cols)
-                result = round(float(op_func(df[col].dropna())), 2) if len(df[col].dropna()) > 0 else 0
-                examples.append(create_example(df, sheet_name,
+            for u_col in rng.random(per_task).tolist():
+                col = _pick(numeric_cols, u_col)
+                values = nonnull[col]
+                result = round(float(op_func(values)), 2) if len(values) > 0 else 0
+                yield create_example(df, sheet_name,
                     f"What is the {op_name} of {col}?",
-                    {"operation": op_name, "column": col, "result": result, "insufficient": False}))
+                    {"operation": op_name, "column": col, "result": result, "insufficient": False})
             
             # Aggregation with filter
             if categorical_cols:
-                for _ in range(per_task):
-                    num_col = random.choice(numeric_cols)
-                    cat_col = random.choice(categorical_cols)
-                    val = random.choice(df[cat_col].dropna().unique())
+                for u_num, u_cat, u_val in rng.random((per_task, 3)).tolist():
+                    num_col = _pick(numeric_cols, u_num)
+                    cat_col = _pick(categorical_cols, u_cat)
+                    val = _pick(uniques[cat_col], u_val)
                     filtered = df[df[cat_col] == val]
                     result = round(float(op_func(filtered[num_col].dropna())), 2) if len(filtered) > 0 else 0
-                    examples.append(create_example(df, sheet_name,
+                    yield create_example(df, sheet_name,
                         f"What is the {op_name} of {num_col} where {cat_col}='{val}'?",
-                        {"operation": op_name, "column": num_col, "filters": {cat_col: val}, "result": result, "insufficient": len(filtered)==0}))
+                        {"operation": op_name, "column": num_col, "filters": {cat_col: val}, "result": result, "insufficient": len(filtered)==0})
             
             # Aggregation with group by
             if categorical_cols:
-                for _ in range(per_task):
-                    num_col = random.choice(numeric_cols)
-                    cat_col = random.choice(categorical_cols)
-                    result = df.groupby(cat_col)[num_col].apply(op_func).round(2).to_dict()
-                    examples.append(create_example(df, sheet_name,
+                for u_num, u_cat in rng.random((per_task, 2)).tolist():
+                    num_col = _pick(numeric_cols, u_num)
+                    cat_col = _pick(categorical_cols, u_cat)
+                    stats = group_stats.get((cat_col, num_col))
+                    if stats is None:
+                        stats = df.groupby(cat_col, observed=True)[num_col].agg(['sum', 'mean', 'min', 'max', 'median', 'std']).round(2)
+                        group_stats[(cat_col, num_col)] = stats
+                    result = stats['mean' if op_name == 'avg' else op_name].to_dict()
+                    yield create_example(df, sheet_name,
                         f"What is the {op_name} of {num_col} grouped by {cat_col}?",
-                        {"operation": op_name, "column": num_col, "group_by": cat_col, "result": result, "insufficient": False}))
+                        {"operation": op_name, "column": num_col, "group_by": cat_col, "result": result, "insufficient": False})
             
             # Aggregation with range
             if len(numeric_cols) >= 2:
-                for _ in range(per_task):
-                    num_col = random.choice(numeric_cols)
-                    filter_col = random.choice(numeric_cols)
-                    min_val = round(float(df[filter_col].quantile(0.25)), 2)
-                    max_val = round(float(df[filter_col].quantile(0.75)), 2)
-                    filtered = df[(df[filter_col] >= min_val) & (df[filter_col] <= max_val)]
-                    result = round(float(op_func(filtered[num_col].dropna())), 2) if len(filtered) > 0 else 0
-                    examples.append(create_example(df, sheet_name,
+                for u_num, u_filter in rng.random((per_task, 2)).tolist():
+                    num_col = _pick(numeric_cols, u_num)
+                    filter_col = _pick(numeric_cols, u_filter)
+                    if filter_col not in iqr_filters:
+                        q25, q75 = df[filter_col].quantile([0.25, 0.75])
+                        lo, hi = round(float(q25), 2), round(float(q75), 2)
+                        iqr_filters[filter_col] = (lo, hi, ((df[filter_col] >= lo) & (df[filter_col] <= hi)).to_numpy())
+                    min_val, max_val, in_range = iqr_filters[filter_col]
+                    key = (op_name, num_col, filter_col)
+                    if key not in range_results:
+                        values = df[num_col][in_range]
+                        range_results[key] = round(float(op_func(values.dropna())), 2) if len(values) > 0 else 0
+                    result = range_results[key]
+                    yield create_example(df, sheet_name,
                         f"What is the {op_name} of {num_col} where {filter_col} is between {min_val} and {max_val}?",
-                        {"operation": op_name, "column": num_col, "filters": {filter_col: f"{min_val}-{max_val}"}, "result": result, "insufficient": False}))
+                        {"operation": op_name, "column": num_col, "filters": {filter_col: f"{min_val}-{max_val}"}, "result": result, "insufficient": False})
     
     # ==========================================
     # CATEGORY 3: PERCENTILES (10 types)
     # ==========================================
     
     if numeric_cols:
-        for percentile in [10, 25, 50, 75, 90, 95, 99]:
-            for _ in range(per_task):
-                col = random.choice(numeric_cols)
-                result = round(float(df[col].quantile(percentile/100)), 2)
-                examples.append(create_example(df, sheet_name,
+        percentiles = [10, 25, 50, 75, 90, 95, 99]
+        # Every percentile of a column from one quantile call (one sort)
+        percentile_values = {}
+        for percentile in percentiles:
+            for u_col in rng.random(per_task).tolist():
+                col = _pick(numeric_cols, u_col)
+                if col not in percentile_values:
+                    qs = df[col].quantile([p / 100 for p in percentiles]).to_numpy()
+                    percentile_values[col] = dict(zip(percentiles, qs))
+                result = round(float(percentile_values[col][percentile]), 2)
+                yield create_example(df, sheet_name,
                     f"What is the {percentile}th percentile of {col}?",
-                    {"operation": f"percentile_{percentile}", "column": col, "result": result, "insufficient": False}))
+                    {"operation": f"percentile_{percentile}", "column": col, "result": result, "insufficient": False})
     
     # ==========================================
     # CATEGORY 4: DISTINCT COUNTS (5 types)
     # ==========================================
     
-    for _ in range(per_task * 5):
-        col = random.choice(df.columns)
-        count = int(df[col].nunique())
-        examples.append(create_example(df, sheet_name,
+    columns = df.columns.tolist()
+    distinct_counts = df.nunique().to_dict()
+    for u_col in rng.random(per_task * 5).tolist():
+        col = _pick(columns, u_col)
+        count = int(distinct_counts[col])
+        yield create_example(df, sheet_name,
             f"How many distinct values are in column {col}?",
-            {"operation": "count_distinct", "column": col, "result": count, "insufficient": False}))
+            {"operation": "count_distinct", "column": col, "result": count, "insufficient": False})
     
     # ==========================================
     # CATEGORY 5: NULL ANALYSIS (5 types)
     # ==========================================
     
-    for _ in range(per_task * 5):
-        col = random.choice(df.columns)
-        null_count = int(df[col].isna().sum())
-        examples.append(create_example(df, sheet_name,
+    null_counts = df.isna().sum().to_dict()
+    for u_col in rng.random(per_task * 5).tolist():
+        col = _pick(columns, u_col)
+        null_count = int(null_counts[col])
+        yield create_example(df, sheet_name,
             f"How many null/missing values are in column {col}?",
-            {"operation": "count_nulls", "column": col, "result": null_count, "insufficient": False}))
+            {"operation": "count_nulls", "column": col, "result": null_count, "insufficient": False})
     
     # ==========================================
     # CATEGORY 6: DATE/TIME (10 types)
@@ -408,27 +513,31 @@ def generate_diverse_tasks(df: pd.DataFrame, sheet_name: str, n_samples: int = 1
     if date_cols:
         date_col = date_cols[0]
         df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
+        # The sample rows now render the parsed dates
+        clear_context_cache()
         
-        # By year
-        for _ in range(per_task * 3):
-            years = df[date_col].dt.year.dropna().unique()
+        # By year: one value_counts of the year column answers every draw
+        year_counts = df[date_col].dt.year.value_counts().to_dict()
+        years = list(year_counts)
+        for u_year in rng.random(per_task * 3).tolist():
             if len(years) > 0:
-                year = random.choice(years)
-                count = len(df[df[date_col].dt.year == year])
-                examples.append(create_example(df, sheet_name,
+                year = _pick(years, u_year)
+                count = year_counts[year]
+                yield create_example(df, sheet_name,
                     f"How many records are from year {int(year)}?",
-                    {"count": count, "criteria": {"year": int(year)}, "insufficient": False}))
+                    {"count": count, "criteria": {"year": int(year)}, "insufficient": False})
         
-        # Date range
-        for _ in range(per_task * 7):
-            valid_dates = df[date_col].dropna()
-            if len(valid_dates) > 0:
-                start = valid_dates.min()
-                end = start + pd.DateOffset(months=random.randint(1, 12))
-                count = len(df[(df[date_col] >= start) & (df[date_col] <= end)])
-                examples.append(create_example(df, sheet_name,
+        # Date range: ranges start at the earliest date, so a binary search of
+        # the sorted dates for the end gives the count
+        sorted_dates = df[date_col].dropna().sort_values(ignore_index=True)
+        for months in rng.integers(1, 13, size=per_task * 7).tolist():
+            if len(sorted_dates) > 0:
+                start = sorted_dates.iloc[0]
+                end = start + pd.DateOffset(months=months)
+                count = int(sorted_dates.searchsorted(end, side='right'))
+                yield create_example(df, sheet_name,
                     f"How many records are between {start.date()} and {end.date()}?",
-                    {"count": count, "criteria": {"date_range": f"{start.date()} to {end.date()}"}, "insufficient": False}))
+                    {"count": count, "criteria": {"date_range": f"{start.date()} to {end.date()}"}, "insufficient": False})
 
     # After potentially converting columns to datetime above, refresh numeric_cols
     try:
@@ -446,77 +555,147 @@ def generate_diverse_tasks(df: pd.DataFrame, sheet_name: str, n_samples: int = 1
     # ==========================================
     
     if len(numeric_cols) >= 2:
-        for _ in range(per_task * 5):
-            col1, col2 = random.sample(numeric_cols, 2)
-            df['temp_ratio'] = df[col1] / (df[col2].replace(0, np.nan))
-            avg_ratio = round(float(df['temp_ratio'].mean()), 2) if df['temp_ratio'].notna().any() else 0
-            examples.append(create_example(df, sheet_name,
+        # Ratios on plain float arrays: no temporary frame column per example
+        arrays = {col: df[col].to_numpy(dtype=np.float64, na_value=np.nan) for col in numeric_cols}
+        ratio_results = {}
+        for u_col1, u_col2 in rng.random((per_task * 5, 2)).tolist():
+            col1, col2 = _pick_two(numeric_cols, u_col1, u_col2)
+            if (col1, col2) not in ratio_results:
+                denominator = arrays[col2]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    ratio = arrays[col1] / np.where(denominator == 0, np.nan, denominator)
+                valid = ~np.isnan(ratio)
+                ratio_results[(col1, col2)] = round(float(ratio[valid].mean()), 2) if valid.any() else 0
+            avg_ratio = ratio_results[(col1, col2)]
+            yield create_example(df, sheet_name,
                 f"What is the average ratio of {col1} to {col2}?",
-                {"operation": "avg_ratio", "columns": [col1, col2], "result": avg_ratio, "insufficient": False}))
-            df.drop('temp_ratio', axis=1, inplace=True)
+                {"operation": "avg_ratio", "columns": [col1, col2], "result": avg_ratio, "insufficient": False})
     
     # ==========================================
     # CATEGORY 8: TOP/BOTTOM N (10 types)
     # ==========================================
     
     if numeric_cols and categorical_cols:
-        for _ in range(per_task * 5):
-            num_col = random.choice(numeric_cols)
-            cat_col = random.choice(categorical_cols)
-            top_n = df.groupby(cat_col)[num_col].sum().nlargest(3).to_dict()
-            examples.append(create_example(df, sheet_name,
+        # (top 3, bottom 3) per (group column, value column) from one grouped
+        # sum, shared by both loops
+        ranked = {}
+        
+        def top_and_bottom(cat_col, num_col):
+            key = (cat_col, num_col)
+            if key not in ranked:
+                sums = df.groupby(cat_col, observed=True, sort=False)[num_col].sum()
+                ranked[key] = (sums.nlargest(3).to_dict(), sums.nsmallest(3).to_dict())
+            return ranked[key]
+        
+        for u_num, u_cat in rng.random((per_task * 5, 2)).tolist():
+            num_col = _pick(numeric_cols, u_num)
+            cat_col = _pick(categorical_cols, u_cat)
+            top_n = top_and_bottom(cat_col, num_col)[0]
+            yield create_example(df, sheet_name,
                 f"What are the top 3 {cat_col} by total {num_col}?",
-                {"operation": "top_n", "n": 3, "group_by": cat_col, "column": num_col, "result": top_n, "insufficient": False}))
+                {"operation": "top_n", "n": 3, "group_by": cat_col, "column": num_col, "result": top_n, "insufficient": False})
         
-        for _ in range(per_task * 5):
-            num_col = random.choice(numeric_cols)
-            cat_col = random.choice(categorical_cols)
-            bottom_n = df.groupby(cat_col)[num_col].sum().nsmallest(3).to_dict()
-            examples.append(create_example(df, sheet_name,
+        for u_num, u_cat in rng.random((per_task * 5, 2)).tolist():
+            num_col = _pick(numeric_cols, u_num)
+            cat_col = _pick(categorical_cols, u_cat)
+            bottom_n = top_and_bottom(cat_col, num_col)[1]
+            yield create_example(df, sheet_name,
                 f"What are the bottom 3 {cat_col} by total {num_col}?",
-                {"operation": "bottom_n", "n": 3, "group_by": cat_col, "column": num_col, "result": bottom_n, "insufficient": False}))
+                {"operation": "bottom_n", "n": 3, "group_by": cat_col, "column": num_col, "result": bottom_n, "insufficient": False})
     
     # ==========================================
     # CATEGORY 9: MULTI-COLUMN GROUPING (5 types)
     # ==========================================
     
     if len(categorical_cols) >= 2 and numeric_cols:
-        for _ in range(per_task * 5):
-            cat1, cat2 = random.sample(categorical_cols, 2)
-            num_col = random.choice(numeric_cols)
-            result = df.groupby([cat1, cat2])[num_col].sum().head(10).to_dict()
-            examples.append(create_example(df, sheet_name,
+        # The rendered first-10 groups per (cat1, cat2, num_col) triple; the
+        # answer format (a str() of the dict) is unchanged
+        grouped_results = {}
+        for u_cat1, u_cat2, u_num in rng.random((per_task * 5, 3)).tolist():
+            cat1, cat2 = _pick_two(categorical_cols, u_cat1, u_cat2)
+            num_col = _pick(numeric_cols, u_num)
+            key = (cat1, cat2, num_col)
+            if key not in grouped_results:
+                grouped_results[key] = str(df.groupby([cat1, cat2], observed=True)[num_col].sum().head(10).to_dict())
+            result = grouped_results[key]
+            yield create_example(df, sheet_name,
                 f"What is the total {num_col} grouped by {cat1} and {cat2}?",
-                {"operation": "sum", "group_by": [cat1, cat2], "column": num_col, "result": str(result), "insufficient": False}))
+                {"operation": "sum", "group_by": [cat1, cat2], "column": num_col, "result": result, "insufficient": False})
     
     # ==========================================
     # CATEGORY 10: EDGE CASES (10 types)
     # ==========================================
     
     # Missing column
-    for _ in range(per_task * 5):
-        fake_col = f"NonExistent_{random.randint(1,1000)}"
-        examples.append(create_example(df, sheet_name,
+    for fake_id in rng.integers(1, 1001, size=per_task * 5).tolist():
+        fake_col = f"NonExistent_{fake_id}"
+        yield create_example(df, sheet_name,
             f"What is the average of column {fake_col}?",
-            {"operation": "avg", "column": fake_col, "result": None, "insufficient": True, "reason": f"Column '{fake_col}' does not exist."}))
+            {"operation": "avg", "column": fake_col, "result": None, "insufficient": True, "reason": f"Column '{fake_col}' does not exist."})
     
     # Empty result
     if categorical_cols:
-        for _ in range(per_task * 5):
-            col = random.choice(categorical_cols)
-            fake_val = f"NonExistent_{random.randint(1,1000)}"
-            examples.append(create_example(df, sheet_name,
+        n_empty = per_task * 5
+        for u_col, fake_id in zip(rng.random(n_empty).tolist(), rng.integers(1, 1001, size=n_empty).tolist()):
+            col = _pick(categorical_cols, u_col)
+            fake_val = f"NonExistent_{fake_id}"
+            yield create_example(df, sheet_name,
                 f"How many records have {col}='{fake_val}'?",
-                {"count": 0, "criteria": {col: fake_val}, "insufficient": True, "reason": "No matching records."}))
-    
-    print(f"    ✅ Generated {len(examples)} examples for {sheet_name}")
-    return examples
+                {"count": 0, "criteria": {col: fake_val}, "insufficient": True, "reason": "No matching records."})
+
+# (dataset key, sheet name, examples to generate, label) for each training dataset
+DATASET_TASKS = (
+    ('superstore', 'superstore', 10000, "Superstore Orders"),
+    ('hr', 'HR_Analytics', 15000, "HR Analytics"),
+    ('netflix', 'Netflix', 10000, "Netflix"),
+    ('ecommerce', 'Ecommerce', 10000, "E-commerce"),
+    ('adult', 'Adult_Income', 5000, "Adult Income"),
+)
+
+def write_examples(path: Path, examples: Iterable[Dict[str, Any]]) -> List[Tuple[int, int]]:
+    """Stream examples to a JSONL file and return each line's (offset, length)."""
+    spans = []
+    offset = 0
+    with open(path, "wb") as f:
+        for ex in examples:
+            line = _encode_line(ex)
+            f.write(line)
+            spans.append((offset, len(line)))
+            offset += len(line)
+    return spans
+
+def shuffle_parts(parts: List[Tuple[Path, List[Tuple[int, int]]]], output_path: Path, seed: Optional[int] = None) -> int:
+    """Write every line of the part files to ``output_path`` in random order; only the offsets are held in memory."""
+    order = [(i, offset, length) for i, (_, spans) in enumerate(parts) for offset, length in spans]
+    random.Random(seed).shuffle(order)
+    sources = [open(path, "rb") for path, _ in parts]
+    try:
+        with open(output_path, "wb") as out:
+            for i, offset, length in order:
+                src = sources[i]
+                src.seek(offset)
+                out.write(src.read(length))
+    finally:
+        for src in sources:
+            src.close()
+    return len(order)
+
+def _generate_dataset(job):
+    """Stream one (df, sheet_name, n_samples, seed, part_path) job's examples to its part file; top-level so worker processes can call it."""
+    df, sheet_name, n_samples, seed, part_path = job
+    try:
+        spans = write_examples(part_path, generate_diverse_tasks(df, sheet_name, n_samples, seed))
+    finally:
+        clear_context_cache()
+    print(f"    ✅ Generated {len(spans)} examples for {sheet_name}")
+    return part_path, spans
 
 # ============================================
 # 5. MAIN EXECUTION
 # ============================================
 
 def main():
+    seed = None
     # Inference mode (optional)
     try:
         import argparse
@@ -526,7 +705,9 @@ def main():
         parser.add_argument('--model', type=str, default='my-finetuned-model', help='Ollama model name to use.')
         parser.add_argument('--rows-limit', type=int, default=50, help='Rows per sheet to include in context.')
         parser.add_argument('--focus-sheet', type=str, default=None, help='Optional specific sheet name to focus on.')
+        parser.add_argument('--seed', type=int, default=None, help='Seed for reproducible training data generation.')
         args, _unknown = parser.parse_known_args()
+        seed = args.seed
         if args.ask:
             if not args.files:
                 print("--files required with --ask")
@@ -568,38 +749,30 @@ def main():
     
     # Step 3: Generate training examples
     print("\n📊 Generating 50,000+ training examples with 100+ task types per dataset...")
-    all_examples = []
-    
-    if 'superstore' in datasets :
-        print("  ⏳ Superstore Orders (10,000 examples)...")
-        all_examples.extend(generate_diverse_tasks(datasets['superstore'], 'superstore', 10000))
-    
-    if 'hr' in datasets:
-        print("  ⏳ HR Analytics (15,000 examples)...")
-        all_examples.extend(generate_diverse_tasks(datasets['hr'], 'HR_Analytics', 15000))
-    
-    if 'netflix' in datasets:
-        print("  ⏳ Netflix (10,000 examples)...")
-        all_examples.extend(generate_diverse_tasks(datasets['netflix'], 'Netflix', 10000))
-    
-    if 'ecommerce' in datasets:
-        print("  ⏳ E-commerce (10,000 examples)...")
-        all_examples.extend(generate_diverse_tasks(datasets['ecommerce'], 'Ecommerce', 10000))
-    
-    if 'adult' in datasets:
-        print("  ⏳ Adult Income (5,000 examples)...")
-        all_examples.extend(generate_diverse_tasks(datasets['adult'], 'Adult_Income', 5000))
-    
-    # Shuffle
-    random.shuffle(all_examples)
-    
-    # Save JSONL
     output_path = Path(exe_dir/"training_jsonl/real_data_50k_diverse_train.jsonl")
-    with open(output_path, "w", encoding="utf-8") as f:
-        for ex in all_examples:
-            f.write(json.dumps(ex, ensure_ascii=False) + "\n")
     
-    print(f"\n✅ Successfully generated {len(all_examples)} training examples!")
+    # Each dataset streams its examples to a part file (in its own process, as
+    # the datasets are independent); the parts are then shuffled into the
+    # output by line offset, so no full list of examples is ever held
+    # Independent per-dataset seeds derived from --seed (fresh entropy without it)
+    dataset_seeds = [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(len(DATASET_TASKS))]
+    with tempfile.TemporaryDirectory(dir=output_path.parent) as tmp_dir:
+        jobs = []
+        for (key, sheet_name, n_samples, label), dataset_seed in zip(DATASET_TASKS, dataset_seeds):
+            if key in datasets:
+                print(f"  ⏳ {label} ({n_samples:,} examples)...")
+                jobs.append((datasets[key], sheet_name, n_samples, dataset_seed, Path(tmp_dir) / f"{key}.jsonl"))
+        
+        workers = min(len(jobs), os.cpu_count() or 1)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parts = list(pool.map(_generate_dataset, jobs))
+        else:
+            parts = [_generate_dataset(job) for job in jobs]
+        
+        total = shuffle_parts(parts, output_path, seed)
+    
+    print(f"\n✅ Successfully generated {total} training examples!")
     print(f"📁 Saved to: {output_path}")
     print(f"\n📈 Each dataset has 100+ diverse task types covering:")
     print(f"   - Basic counts (10 types)")